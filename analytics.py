@@ -0,0 +1,330 @@
+# analytics.py
+"""
+Per-game statistics for finished games.
+
+Every game is appended to ``games.log`` as one fixed-width binary record
+(RECORD) after a short LOG_HEADER, so the log can be read from any record
+offset without parsing what came before. ``stats.json`` holds running aggregates together with
+the log offset they cover. Opening the store folds in only the records
+written since that offset, so summaries never rescan history.
+"""
+import json
+import math
+import os
+import struct
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from snake_logic import Game, EVENT_MOVED, EVENT_ATE, EVENT_DIED, EVENT_WON
+
+STATS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_NAME = "games.log"
+AGGREGATES_NAME = "stats.json"
+
+# finished_at, username, score, ticks, duration_ms, apples, end cause.
+# 80 bytes hold any 20-character name (the GUI's limit) in UTF-8.
+NAME_BYTES = 80
+RECORD = struct.Struct(f"<d{NAME_BYTES}sIIIIB3x")
+# Magic plus format version; bump the version whenever RECORD changes.
+LOG_VERSION = 2
+LOG_HEADER = b"SNAKELOG" + struct.pack("<I", LOG_VERSION)
+CAUSES = ("wall", "self", "won")
+SCORE_BIN = 50  # width of a score histogram bin
+
+
+class GameRecord(NamedTuple):
+    finished_at: float  # unix time
+    username: str
+    score: int
+    ticks: int
+    duration_ms: int
+    apples: int
+    cause: str  # one of CAUSES
+
+    def pack(self) -> bytes:
+        name = self.username.encode("utf-8")
+        if len(name) > NAME_BYTES:
+            # Cut on a character boundary, never through a multibyte one.
+            name = name[:NAME_BYTES].decode("utf-8", "ignore").encode("utf-8")
+        return RECORD.pack(self.finished_at, name, self.score, self.ticks,
+                           self.duration_ms, self.apples, CAUSES.index(self.cause))
+
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0) -> Optional["GameRecord"]:
+        """Decode one record, or return None if it is not a valid one."""
+        at, name, score, ticks, duration, apples, cause = RECORD.unpack_from(buf, offset)
+        if cause >= len(CAUSES) or not math.isfinite(at):
+            return None
+        try:
+            username = name.rstrip(b"\0").decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        return cls(at, username, score, ticks, duration, apples, CAUSES[cause])
+
+
+# ====================================================================
+#  STREAMING AGGREGATES
+# ====================================================================
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch style): any quantile is returned
+    within `relative_accuracy` of a true value, using one counter per
+    occupied bucket regardless of how many values were added.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # midpoint (in relative terms) of (gamma^(key-1), gamma^key]
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+
+    def to_dict(self) -> dict:
+        return {"relative_accuracy": self.relative_accuracy, "zeros": self.zeros,
+                "count": self.count, "buckets": {str(k): v for k, v in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        sketch.buckets = {int(k): v for k, v in data["buckets"].items()}
+        return sketch
+
+
+class GameStats:
+    """Running totals, histograms and sketches over a stream of GameRecords."""
+
+    SKETCHED = ("score", "ticks", "duration_ms")
+
+    def __init__(self):
+        self.games = 0
+        self.totals = Counter()  # score, ticks, duration_ms, apples
+        self.causes = Counter()
+        self.score_histogram = Counter()  # bin start -> games
+        self.sketches = {name: QuantileSketch() for name in self.SKETCHED}
+        self.users: Dict[str, List[int]] = {}  # name -> [games, total score, best]
+
+    def add(self, rec: GameRecord):
+        self.games += 1
+        self.totals.update(score=rec.score, ticks=rec.ticks,
+                           duration_ms=rec.duration_ms, apples=rec.apples)
+        self.causes[rec.cause] += 1
+        self.score_histogram[rec.score // SCORE_BIN * SCORE_BIN] += 1
+        for name in self.SKETCHED:
+            self.sketches[name].add(getattr(rec, name))
+        user = self.users.setdefault(rec.username, [0, 0, 0])
+        user[0] += 1
+        user[1] += rec.score
+        user[2] = max(user[2], rec.score)
+
+    def mean(self, field: str) -> float:
+        return self.totals[field] / self.games if self.games else 0.0
+
+    def quantile(self, field: str, q: float) -> Optional[float]:
+        return self.sketches[field].quantile(q)
+
+    def apples_per_minute(self) -> float:
+        minutes = self.totals["duration_ms"] / 60000.0
+        return self.totals["apples"] / minutes if minutes else 0.0
+
+    def user_summary(self, username: str) -> Tuple[int, float, int]:
+        """(games played, mean score, best score) for one player."""
+        games, total, best = self.users.get(username, (0, 0, 0))
+        return games, total / games if games else 0.0, best
+
+    def to_dict(self) -> dict:
+        return {"games": self.games, "totals": dict(self.totals),
+                "causes": dict(self.causes),
+                "score_histogram": {str(k): v for k, v in self.score_histogram.items()},
+                "sketches": {k: s.to_dict() for k, s in self.sketches.items()},
+                "users": self.users}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GameStats":
+        stats = cls()
+        stats.games = data["games"]
+        stats.totals = Counter(data["totals"])
+        stats.causes = Counter(data["causes"])
+        stats.score_histogram = Counter({int(k): v for k, v in data["score_histogram"].items()})
+        stats.sketches = {k: QuantileSketch.from_dict(v) for k, v in data["sketches"].items()}
+        stats.users = data["users"]
+        return stats
+
+
+# ====================================================================
+#  STORE
+# ====================================================================
+class StatsStore:
+    """The game log plus its aggregates, kept in step on every append."""
+
+    def __init__(self, directory: str = STATS_DIR):
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.aggregates_path = os.path.join(directory, AGGREGATES_NAME)
+        self.stats = GameStats()
+        self.offset = len(LOG_HEADER)  # bytes of the log folded into self.stats
+        self.skipped = 0  # invalid records passed over since opening
+        self._load_aggregates()
+        self.catch_up()
+
+    def _load_aggregates(self):
+        try:
+            with open(self.aggregates_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != LOG_VERSION:
+                return
+            self.stats = GameStats.from_dict(data["stats"])
+            self.offset = int(data["offset"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self.stats, self.offset = GameStats(), len(LOG_HEADER)
+
+    def _save_aggregates(self):
+        tmp = f"{self.aggregates_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": LOG_VERSION, "offset": self.offset,
+                       "stats": self.stats.to_dict()}, f)
+        os.replace(tmp, self.aggregates_path)
+
+    def _set_aside(self):
+        """Move a log in another format out of the way (kept as games.log.old)."""
+        os.replace(self.log_path, self.log_path + ".old")
+        self.stats, self.offset = GameStats(), len(LOG_HEADER)
+
+    def catch_up(self) -> int:
+        """
+        Fold in records appended since the last call (by anyone). Returns how
+        many were folded; invalid records are skipped and counted in `skipped`.
+        """
+        try:
+            with open(self.log_path, "rb") as f:
+                header = f.read(len(LOG_HEADER))
+                if header != LOG_HEADER:
+                    if not LOG_HEADER.startswith(header):
+                        f.close()
+                        self._set_aside()
+                    return 0  # else: another process is still writing the header
+                size = os.fstat(f.fileno()).st_size
+                if size < self.offset:
+                    # The log was truncated or replaced: rebuild from scratch.
+                    self.stats, self.offset = GameStats(), len(LOG_HEADER)
+                end = size - (size - self.offset) % RECORD.size  # ignore a torn tail
+                if end <= self.offset:
+                    return 0
+                f.seek(self.offset)
+                chunk = f.read(end - self.offset)
+        except OSError:
+            return 0
+        folded = 0
+        for pos in range(0, len(chunk), RECORD.size):
+            rec = GameRecord.unpack_from(chunk, pos)
+            if rec is None:
+                self.skipped += 1
+                continue
+            self.stats.add(rec)
+            folded += 1
+        self.offset = end
+        try:
+            self._save_aggregates()
+        except OSError:
+            pass  # still correct in memory; the next save covers it
+        return folded
+
+    def append(self, rec: GameRecord):
+        try:
+            with open(self.log_path, "xb") as f:
+                f.write(LOG_HEADER)
+        except FileExistsError:
+            pass
+        # O_APPEND keeps concurrent writers' records whole and in one piece.
+        with open(self.log_path, "ab") as f:
+            f.write(rec.pack())
+        self.catch_up()
+
+    def records(self, start: int = 0):
+        """Iterate valid logged games from record index `start` on."""
+        try:
+            f = open(self.log_path, "rb")
+        except OSError:
+            return
+        with f:
+            if f.read(len(LOG_HEADER)) != LOG_HEADER:
+                return
+            f.seek(len(LOG_HEADER) + start * RECORD.size)
+            while True:
+                buf = f.read(RECORD.size)
+                if len(buf) < RECORD.size:
+                    return
+                rec = GameRecord.unpack_from(buf)
+                if rec is not None:
+                    yield rec
+
+
+class GameRecorder:
+    """Follows a Game's events and logs a GameRecord when it ends."""
+
+    def __init__(self, game: Game, store: StatsStore):
+        self.store = store
+        self.username = ""
+        self.ticks = 0
+        self.apples = 0
+        self.started = time.monotonic()
+        self.error: Optional[OSError] = None  # last failed write, if any
+        game.subscribe(EVENT_MOVED, self._on_moved)
+        game.subscribe(EVENT_ATE, self._on_ate)
+        game.subscribe(EVENT_DIED, self._on_died)
+        game.subscribe(EVENT_WON, self._on_won)
+
+    def begin(self, username: str):
+        """Call when a new game starts."""
+        self.username = username
+        self.ticks = 0
+        self.apples = 0
+        self.started = time.monotonic()
+
+    def _on_moved(self, event):
+        self.ticks += 1
+
+    def _on_ate(self, event):
+        self.apples += 1
+
+    def _on_died(self, event):
+        self.ticks += 1  # the fatal step does not move the snake
+        self._finish(event.score, event.cause)
+
+    def _on_won(self, event):
+        self._finish(event.score, "won")
+
+    def _finish(self, score: int, cause: str):
+        duration_ms = int((time.monotonic() - self.started) * 1000)
+        rec = GameRecord(time.time(), self.username, score, self.ticks,
+                         duration_ms, self.apples, cause)
+        try:
+            self.store.append(rec)
+        except OSError as e:
+            # Runs inside Game.step(): losing one stats record beats
+            # aborting the tick.
+            self.error = e
@@ -0,0 +1,237 @@
+# score_server.py
+"""
+Local score service that owns the user store (users.json).
+
+Kiosks point user_manager at it by setting SNAKE_SCORE_SERVER to either
+``unix:/path/to/socket`` or ``host:port``. Requests and replies are single
+JSON lines:
+
+    -> {"op": "update_high_score", "username": "potat", "score": 120}
+    <- {"ok": true, "result": true}
+
+Reads are served from memory. Writes are applied to memory at once and
+acknowledged after they are on disk; writes arriving within one batch
+window share a single file commit.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from user_manager import USERS_FILE
+
+BATCH_WINDOW = 0.02   # seconds to wait for more writes before committing
+MAX_BATCH = 256       # commit immediately once this many writes are pending
+RECHECK_INTERVAL = 1.0  # seconds between checks for out-of-band file edits
+
+
+class ScoreStore:
+    """In-memory user store with batched, atomic commits to a JSON file."""
+
+    def __init__(self, path: str = USERS_FILE):
+        self.path = path
+        self.users: Dict[str, int] = {}
+        self._ranking: Optional[List[Tuple[str, int]]] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._waiters: List[asyncio.Future] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._committing = False
+        self.commits = 0
+        self.writes = 0
+        self._load()
+
+    # -- file I/O -----------------------------------------------------
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _load(self):
+        users = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                users = data
+        except (OSError, json.JSONDecodeError):
+            pass
+        self.users = users
+        self._ranking = None
+        self._mtime = self._file_mtime()
+
+    def _write(self, users: Dict[str, int]):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(users, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def refresh(self):
+        """Reload if someone edited the file behind our back (rate-limited)."""
+        now = time.monotonic()
+        if self._waiters or self._committing or now - self._checked_at < RECHECK_INTERVAL:
+            return
+        self._checked_at = now
+        if self._file_mtime() != self._mtime:
+            self._load()
+
+    # -- batching -----------------------------------------------------
+    def _schedule_commit(self) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._waiters.append(fut)
+        self.writes += 1
+        self._ranking = None
+        if len(self._waiters) >= MAX_BATCH:
+            self._start_commit()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(BATCH_WINDOW, self._start_commit)
+        return fut
+
+    def _start_commit(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._committing or not self._waiters:
+            return
+        asyncio.ensure_future(self._commit())
+
+    async def _commit(self):
+        self._committing = True
+        waiters, self._waiters = self._waiters, []
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write, dict(self.users))
+            self._mtime = self._file_mtime()
+            self.commits += 1
+            for fut in waiters:
+                if not fut.done():
+                    fut.set_result(None)
+        except OSError as e:
+            for fut in waiters:
+                if not fut.done():
+                    fut.set_exception(e)
+        finally:
+            self._committing = False
+        if self._waiters:
+            # Writes that arrived during the commit form the next batch.
+            self._start_commit()
+
+    # -- operations ---------------------------------------------------
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        if self._ranking is None:
+            self._ranking = sorted(self.users.items(), key=lambda x: x[1], reverse=True)
+        return self._ranking[:k]
+
+    async def create_user(self, username: str) -> bool:
+        if username in self.users:
+            return False
+        self.users[username] = 0
+        await self._schedule_commit()
+        return True
+
+    async def update_high_score(self, username: str, score: int) -> bool:
+        if username not in self.users or score <= self.users[username]:
+            return False
+        self.users[username] = score
+        await self._schedule_commit()
+        return True
+
+    async def save_users(self, users: Dict[str, int]) -> bool:
+        self.users = dict(users)
+        await self._schedule_commit()
+        return True
+
+
+class ScoreServer:
+    def __init__(self, store: ScoreStore):
+        self.store = store
+
+    async def handle(self, request: dict):
+        store = self.store
+        op = request.get("op")
+        if op in ("load_users", "get_high_score", "has_users", "top"):
+            store.refresh()
+        if op == "load_users":
+            return dict(store.users)
+        if op == "get_high_score":
+            return store.users.get(request["username"], 0)
+        if op == "has_users":
+            return bool(store.users)
+        if op == "top":
+            return store.top(int(request.get("k", 10)))
+        if op == "create_user":
+            return await store.create_user(request["username"])
+        if op == "update_high_score":
+            return await store.update_high_score(request["username"], int(request["score"]))
+        if op == "save_users":
+            return await store.save_users(request["users"])
+        raise ValueError(f"unknown op {op!r}")
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.endswith(b"\n"):
+                    # EOF, possibly mid-request: a truncated line is never
+                    # applied, so the client may safely send it again.
+                    break
+                try:
+                    reply = {"ok": True, "result": await self.handle(json.loads(line))}
+                except (ValueError, KeyError, TypeError, OSError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, address: str):
+        if address.startswith("unix:"):
+            path = address[len("unix:"):]
+            if os.path.exists(path):
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(path)
+                except OSError:
+                    os.unlink(path)  # stale socket left by a dead server
+                else:
+                    raise RuntimeError(f"a score server is already listening on {address}")
+                finally:
+                    probe.close()
+            server = await asyncio.start_unix_server(self._client, path)
+        else:
+            host, _, port = address.rpartition(":")
+            server = await asyncio.start_server(self._client, host or "127.0.0.1", int(port))
+        print(f"score server listening on {address} ({self.store.path})", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local Snake score service")
+    parser.add_argument("address", nargs="?", default="127.0.0.1:8766",
+                        help="unix:/path/to/socket or host:port")
+    parser.add_argument("--file", default=USERS_FILE, help="user store to own")
+    args = parser.parse_args(argv)
+    server = ScoreServer(ScoreStore(args.file))
+    try:
+        asyncio.run(server.serve(args.address))
+    except KeyboardInterrupt:
+        pass
+    except (RuntimeError, OSError) as e:
+        print(f"score server: {e}", file=sys.stderr)
+        return 1
+    store = server.store
+    print(f"{store.writes} writes in {store.commits} commits", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+# snake.py
+"""
+Command-line entry point: ``python -m snake <command> [options]``.
+
+  play       open the Tk game window
+  spectate   watch many bot games at once in one window
+  simulate   run bot games headlessly and summarise the scores
+  replay     re-run a recorded game (as text, or exported to PNG/GIF)
+  bench      measure raw Game.step throughput
+  stats      summarise finished games from the analytics log
+
+Only `play` and `spectate` import tkinter, and only `play` imports
+user_manager, so the headless commands start without touching the GUI
+stack or the user store.
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from snake_logic import Game, EVENT_MOVED, EVENT_DIED, EVENT_WON
+
+DEFAULT_WIDTH = 30
+DEFAULT_HEIGHT = 20
+DEFAULT_SPEED = 130  # ms between steps
+
+# One character per tick in recorded games; "." means no input that tick.
+MOVE_CODES = {"Left": "L", "Right": "R", "Up": "U", "Down": "D"}
+CODE_MOVES = {c: d for d, c in MOVE_CODES.items()}
+
+
+def _make_bot(name: str, seed: Optional[int], budget_ms: float = 20.0):
+    import random
+    import snake_ai
+
+    if name == "greedy":
+        return snake_ai.greedy_move
+    if name == "mcts":
+        return snake_ai.MCTSPlayer(budget_ms=budget_ms, seed=seed)
+    rng = random.Random(seed)
+    return lambda game: snake_ai.random_move(game, rng)
+
+
+class MoveRecorder:
+    """Records one move code per tick from a Game's events, for `replay`."""
+
+    def __init__(self, game: Game):
+        self.codes: List[str] = []
+        game.subscribe(EVENT_MOVED, self._on_tick)
+        game.subscribe(EVENT_DIED, self._on_tick)
+
+    def _on_tick(self, event):
+        # The direction the snake took (or tried to take, when it died);
+        # stepping with it again reproduces the tick exactly.
+        self.codes.append(MOVE_CODES[event.direction])
+
+    def moves(self) -> str:
+        return "".join(self.codes)
+
+
+def play_game(game: Game, bot, max_ticks: int) -> str:
+    """Run `game` to completion under `bot`. Returns the recorded moves."""
+    recorder = MoveRecorder(game)
+    while game.is_running() and len(recorder.codes) < max_ticks:
+        game.step(direction=bot(game))
+    return recorder.moves()
+
+
+def render_text(game: Game) -> str:
+    grid = [["." for _ in range(game.grid_width)] for _ in range(game.grid_height)]
+    if game.food is not None:
+        fx, fy = game.food
+        grid[fy][fx] = "*"
+    for i, (x, y) in enumerate(game.snake.body):
+        if 0 <= x < game.grid_width and 0 <= y < game.grid_height:
+            grid[y][x] = "@" if i == 0 else "o"
+    return "\n".join("".join(row) for row in grid)
+
+
+# ====================================================================
+#  COMMANDS
+# ====================================================================
+def cmd_play(args) -> int:
+    import tkinter as tk
+    from snake_gui import SnakeGUI
+
+    # Leave half of each tick for drawing when a search bot is driving.
+    bot = _make_bot(args.bot, None, args.speed / 2) if args.bot else None
+    root = tk.Tk()
+    SnakeGUI(root, grid_width=args.width, grid_height=args.height,
+             game_speed=args.speed, bot=bot)
+    root.resizable(False, False)
+    root.mainloop()
+    return 0
+
+
+def cmd_spectate(args) -> int:
+    import tkinter as tk
+    from snake_spectator import Board, SpectatorWall
+
+    boards = []
+    for i in range(args.boards):
+        seed = args.seed + i
+        boards.append(Board(Game(args.width, args.height, seed=seed),
+                            _make_bot(args.bot, seed, args.budget_ms)))
+    root = tk.Tk()
+    SpectatorWall(root, boards, cell_px=args.cell, fps=args.fps, step_ms=args.speed)
+    root.resizable(False, False)
+    root.mainloop()
+    return 0
+
+
+def cmd_simulate(args) -> int:
+    import json
+    from collections import Counter
+
+    records = []
+    scores = []
+    ticks = 0
+    endings: Counter = Counter()
+    on_died = lambda ev: endings.update((ev.cause,))
+    on_won = lambda ev: endings.update(("won",))
+    # The search bot is kept across games so its statistics add up; the
+    # others get a fresh bot per game, so any game replays alone by seed.
+    shared = _make_bot(args.bot, args.seed, args.budget_ms) if args.bot == "mcts" else None
+    started = time.perf_counter()
+    for i in range(args.games):
+        seed = args.seed + i
+        bot = shared or _make_bot(args.bot, seed)
+        game = Game(args.width, args.height, seed=seed)
+        game.subscribe(EVENT_DIED, on_died)
+        game.subscribe(EVENT_WON, on_won)
+        moves = play_game(game, bot, args.max_ticks)
+        ticks += len(moves)
+        scores.append(game.score)
+        if args.record:
+            records.append({"width": args.width, "height": args.height,
+                            "start_length": game.start_length, "seed": seed,
+                            "score": game.score, "moves": moves})
+    elapsed = time.perf_counter() - started
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec) + "\n")
+
+    print(f"{args.games} games, {ticks} ticks in {elapsed:.2f}s "
+          f"({ticks / elapsed:.0f} ticks/s)")
+    print(f"score: mean {sum(scores) / len(scores):.1f}  "
+          f"min {min(scores)}  max {max(scores)}")
+    unfinished = args.games - sum(endings.values())
+    print(f"endings: wall {endings['wall']}  self {endings['self']}  "
+          f"won {endings['won']}  unfinished {unfinished}")
+    if shared is not None:
+        print(shared.report())
+    return 0
+
+
+def cmd_replay(args) -> int:
+    import json
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    if not 0 <= args.game < len(lines):
+        print(f"{args.file} holds {len(lines)} game(s); no game {args.game}",
+              file=sys.stderr)
+        return 1
+    rec = json.loads(lines[args.game])
+
+    game = Game(rec["width"], rec["height"], start_length=rec["start_length"],
+                seed=rec["seed"])
+
+    renderer = None
+    writers = []
+    if args.png or args.gif:
+        try:
+            import snake_render
+
+            renderer = snake_render.FrameRenderer(game.grid_width, game.grid_height)
+            if args.png:
+                writers.append(snake_render.PngSequenceWriter(args.png))
+            if args.gif:
+                writers.append(snake_render.GifWriter(args.gif, fps=1000.0 / args.delay))
+        except (ImportError, RuntimeError) as e:
+            print(f"cannot export: {e}", file=sys.stderr)
+            return 1
+
+    started = time.perf_counter()
+    for tick, code in enumerate(rec["moves"]):
+        game.step(direction=CODE_MOVES.get(code))
+        if renderer is not None:
+            frame = renderer.render(game)
+            for writer in writers:
+                writer.write(frame)
+        if args.show:
+            print(f"\x1b[H\x1b[2Jtick {tick + 1}  score {game.score}")
+            print(render_text(game), flush=True)
+            time.sleep(args.delay / 1000.0)
+    for writer in writers:
+        writer.close()
+
+    print(f"replayed {len(rec['moves'])} ticks, score {game.score}")
+    if renderer is not None:
+        elapsed = time.perf_counter() - started
+        print(f"exported {len(rec['moves'])} frames in {elapsed:.2f}s "
+              f"({len(rec['moves']) / elapsed:.0f} frames/s)")
+    if game.score != rec["score"]:
+        print(f"score mismatch: recorded {rec['score']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_bench(args) -> int:
+    game = Game(args.width, args.height, seed=args.seed)
+    bot = _make_bot(args.bot, args.seed)
+    games = 0
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        if not game.is_running():
+            game.reset()
+            games += 1
+        game.step(direction=bot(game))
+    elapsed = time.perf_counter() - started
+    print(f"{args.ticks} steps in {elapsed:.3f}s: "
+          f"{args.ticks / elapsed:.0f} steps/s, "
+          f"{elapsed / args.ticks * 1e6:.1f} us/step ({games} resets)")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    import analytics
+
+    stats = analytics.StatsStore(args.dir or analytics.STATS_DIR).stats
+    if not stats.games:
+        print("no games recorded yet")
+        return 0
+    if args.user:
+        games, mean, best = stats.user_summary(args.user)
+        print(f"{args.user}: {games} games, mean score {mean:.1f}, best {best}")
+        return 0
+
+    print(f"{stats.games} games, {stats.totals['duration_ms'] / 3.6e6:.1f}h played, "
+          f"{stats.apples_per_minute():.1f} apples/min")
+    for field in analytics.GameStats.SKETCHED:
+        p50, p90, p99 = (stats.quantile(field, q) for q in (0.5, 0.9, 0.99))
+        print(f"{field:>12}: mean {stats.mean(field):.0f}  "
+              f"p50 {p50:.0f}  p90 {p90:.0f}  p99 {p99:.0f}")
+    print("      ending: " + "  ".join(f"{c} {stats.causes[c]}" for c in analytics.CAUSES))
+    peak = max(stats.score_histogram.values())
+    for start in sorted(stats.score_histogram):
+        n = stats.score_histogram[start]
+        print(f"{start:>5}-{start + analytics.SCORE_BIN - 1:<5} "
+              f"{'#' * max(1, n * 40 // peak):<40} {n}")
+    return 0
+
+
+# ====================================================================
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {text}")
+    return value
+
+
+def _positive_float(text: str) -> float:
+    value = float(text)
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number, not {text}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m snake",
+                                     description="Snake game tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_grid(p):
+        p.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+        p.add_argument("--height", type=int, default=DEFAULT_HEIGHT)
+
+    p = sub.add_parser("play", help="open the game window")
+    add_grid(p)
+    p.add_argument("--speed", type=_positive_int, default=DEFAULT_SPEED, help="ms per step")
+    p.add_argument("--bot", choices=("greedy", "random", "mcts"),
+                   help="let a bot steer instead of the keyboard")
+    p.set_defaults(func=cmd_play)
+
+    p = sub.add_parser("spectate", help="watch many bot games in one window")
+    add_grid(p)
+    p.add_argument("--boards", type=_positive_int, default=16)
+    p.add_argument("--bot", choices=("greedy", "random", "mcts"), default="greedy")
+    p.add_argument("--budget-ms", type=float, default=1.0,
+                   help="search time per move for the mcts bot (per board)")
+    p.add_argument("--speed", type=_positive_int, default=DEFAULT_SPEED, help="ms per step")
+    p.add_argument("--fps", type=_positive_float, default=30.0, help="target frame rate")
+    p.add_argument("--cell", type=_positive_int, default=6, help="pixels per cell")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_spectate)
+
+    p = sub.add_parser("simulate", help="run bot games headlessly")
+    add_grid(p)
+    p.add_argument("--games", type=_positive_int, default=100)
+    p.add_argument("--bot", choices=("greedy", "random", "mcts"), default="greedy")
+    p.add_argument("--budget-ms", type=float, default=20.0,
+                   help="search time per move for the mcts bot")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--max-ticks", type=_positive_int, default=10000)
+    p.add_argument("--record", metavar="FILE",
+                   help="write every game as a JSON line for `replay`")
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("replay", help="re-run a recorded game")
+    p.add_argument("file")
+    p.add_argument("--game", type=int, default=0, help="line index in FILE")
+    p.add_argument("--show", action="store_true", help="draw each tick as text")
+    p.add_argument("--delay", type=_positive_int, default=DEFAULT_SPEED,
+                   help="ms per tick with --show, and the GIF frame time")
+    p.add_argument("--png", metavar="DIR", help="export every tick as a PNG (needs numpy)")
+    p.add_argument("--gif", metavar="FILE",
+                   help="export an animated GIF (needs numpy and Pillow)")
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("bench", help="measure Game.step throughput")
+    add_grid(p)
+    p.add_argument("--ticks", type=_positive_int, default=100000)
+    p.add_argument("--bot", choices=("greedy", "random"), default="greedy")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("stats", help="summarise recorded games")
+    p.add_argument("--user", help="show one player only")
+    p.add_argument("--dir", default=None,
+                   help="directory holding games.log and stats.json")
+    p.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+# snake_ai.py
+import math
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional, Tuple
+
+from snake_logic import Game, Snake
+
+
+def safe_directions(game: Game) -> list:
+    """Directions that do not hit a wall or the body on the next tick."""
+    snake = game.snake
+    hx, hy = snake.body[0]
+    body_without_tail = set(snake.body[:-1])
+    safe = []
+    for name, (dx, dy) in Snake.DIRECTIONS.items():
+        if Snake.OPPOSITE[name] == snake.direction and len(snake.body) > 1:
+            continue
+        nx, ny = hx + dx, hy + dy
+        if nx < 0 or ny < 0 or nx >= game.grid_width or ny >= game.grid_height:
+            continue
+        if (nx, ny) in body_without_tail:
+            continue
+        safe.append(name)
+    return safe
+
+
+def greedy_move(game: Game) -> Optional[str]:
+    """Head for the food along a safe direction; keep going if nothing is safe."""
+    safe = safe_directions(game)
+    if not safe:
+        return None
+    food = game.get_food_position()
+    if food is None:
+        return safe[0]
+    hx, hy = game.snake.body[0]
+
+    def distance(name: str) -> int:
+        dx, dy = Snake.DIRECTIONS[name]
+        return abs(hx + dx - food[0]) + abs(hy + dy - food[1])
+
+    return min(safe, key=distance)
+
+
+def random_move(game: Game, rng: random.Random) -> Optional[str]:
+    """A random safe direction, or None when trapped."""
+    safe = safe_directions(game)
+    return rng.choice(safe) if safe else None
+
+
+# ====================================================================
+#  MONTE CARLO TREE SEARCH
+# ====================================================================
+class ZobristTable:
+    """Random 64-bit keys for head cell, body cells, direction and food cell."""
+
+    def __init__(self, grid_width: int, grid_height: int, seed: int = 0):
+        rng = random.Random(seed)
+        cells = grid_width * grid_height
+        self.grid_width = grid_width
+        self.head = [rng.getrandbits(64) for _ in range(cells)]
+        self.body = [rng.getrandbits(64) for _ in range(cells)]
+        self.food = [rng.getrandbits(64) for _ in range(cells)]
+        self.direction = {name: rng.getrandbits(64) for name in Snake.DIRECTION_NAMES}
+
+    def hash_game(self, game: Game) -> int:
+        w = self.grid_width
+        body = game.snake.body
+        hx, hy = body[0]
+        h = self.head[hx + hy * w] ^ self.direction[game.snake.direction]
+        for x, y in body[1:]:
+            h ^= self.body[x + y * w]
+        if game.food is not None:
+            fx, fy = game.food
+            h ^= self.food[fx + fy * w]
+        return h
+
+    def step(self, game: Game, h: int, direction: Optional[str]) -> Tuple[int, dict]:
+        """Step `game` and update hash `h` incrementally from what changed."""
+        w = self.grid_width
+        snake = game.snake
+        hx, hy = snake.body[0]
+        tx, ty = snake.body[-1]
+        food = game.food
+        old_dir = snake.direction
+        result = game.step(direction)
+        if not result["alive"]:
+            return h, result
+
+        nx, ny = snake.body[0]
+        old = hx + hy * w
+        h ^= self.head[old] ^ self.body[old] ^ self.head[nx + ny * w]
+        h ^= self.direction[old_dir] ^ self.direction[snake.direction]
+        if result["ate"]:
+            h ^= self.food[food[0] + food[1] * w]
+            if game.food is not None:
+                h ^= self.food[game.food[0] + game.food[1] * w]
+        else:
+            h ^= self.body[tx + ty * w]
+        return h, result
+
+
+class MCTSPlayer:
+    """
+    UCT search over the next moves of a `Game`, bounded by a time budget.
+
+    Rollouts run on a scratch `Game` restored from a snapshot of the real
+    one, with a fresh RNG state each iteration so food respawns are sampled
+    rather than foreseen. Tree statistics are keyed by Zobrist hash in an
+    LRU-bounded transposition table, so states reached along different move
+    orders share visits.
+
+    Call the player like the other bots: ``direction = player(game)``.
+    """
+
+    def __init__(self, budget_ms: float = 50.0, table_size: int = 100000,
+                 exploration: float = 1.0, rollout_depth: int = 20,
+                 seed: Optional[int] = None):
+        self.budget_ms = budget_ms
+        self.table_size = table_size
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random(seed)
+        self._deadline = math.inf
+        # hash -> [visits, per-action visits, per-action value sums]
+        self.table: "OrderedDict[int, list]" = OrderedDict()
+        self.zobrist: Optional[ZobristTable] = None
+        self._scratch: Optional[Game] = None
+        self._root_buf = bytearray()
+        self.rollouts = 0
+        self.search_time = 0.0
+        self.latencies: Deque[float] = deque(maxlen=1000)
+        self.last_rollouts = 0
+
+    def __call__(self, game: Game) -> Optional[str]:
+        return self.choose(game)
+
+    def _prepare(self, game: Game):
+        z = self.zobrist
+        if z is None or z.grid_width != game.grid_width or len(z.head) != (
+                game.grid_width * game.grid_height):
+            self.zobrist = ZobristTable(game.grid_width, game.grid_height)
+            self._scratch = Game(game.grid_width, game.grid_height, game.start_length)
+            self._root_buf = bytearray(game.snapshot_size())
+            self.table.clear()
+
+    def _node(self, h: int) -> Optional[list]:
+        node = self.table.get(h)
+        if node is not None:
+            self.table.move_to_end(h)
+        return node
+
+    def _expand(self, h: int) -> list:
+        node = [0, [0, 0, 0, 0], [0.0, 0.0, 0.0, 0.0]]
+        self.table[h] = node
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+        return node
+
+    def _select(self, node: list, actions: list) -> str:
+        visits, counts, values = node
+        log_n = math.log(visits + 1)
+        best, best_score = actions[0], -1.0
+        for name in actions:
+            a = Snake.DIRECTION_CODES[name]
+            if counts[a] == 0:
+                return name
+            score = values[a] / counts[a] + self.exploration * math.sqrt(log_n / counts[a])
+            if score > best_score:
+                best, best_score = name, score
+        return best
+
+    def _rollout(self, sim: Game, depth: int, apples: float) -> float:
+        """
+        Play on with a noisy greedy policy and return a value in [0, 1]:
+        below 0.5 for dying (later is better), above it for surviving, scaled
+        by the discounted apples eaten along the way, and 1 for filling the
+        board. A rollout still running at the deadline counts as surviving.
+        """
+        horizon = depth + self.rollout_depth
+        for d in range(depth, horizon):
+            if time.perf_counter() >= self._deadline:
+                break
+            move = greedy_move(sim) if self.rng.random() < 0.75 else random_move(sim, self.rng)
+            result = sim.step(move)
+            if result["game_over"]:
+                return 1.0 if result["alive"] else 0.5 * d / horizon
+            if result["ate"]:
+                apples += 0.9 ** d
+        return 0.5 + 0.5 * min(apples, 1.0)
+
+    def _iterate(self, root_hash: int):
+        sim = self._scratch
+        z = self.zobrist
+        sim.restore_from(self._root_buf)
+        sim.rng_state = self.rng.getrandbits(64) | 1
+
+        h = root_hash
+        path = []
+        seen = set()
+        apples = 0.0
+        depth = 0
+        value = None
+        while True:
+            if h in seen or depth >= self.rollout_depth:
+                # Circling back to a state already on this path (a snake
+                # chasing its own tail repeats positions): roll out from here.
+                break
+            if time.perf_counter() >= self._deadline:
+                break
+            seen.add(h)
+            node = self._node(h)
+            if node is None:
+                self._expand(h)
+                break
+            actions = safe_directions(sim)
+            if not actions:
+                value = 0.5 * depth / (depth + self.rollout_depth)
+                break
+            move = self._select(node, actions)
+            path.append((node, Snake.DIRECTION_CODES[move]))
+            h, result = z.step(sim, h, move)
+            if result["ate"]:
+                apples += 0.9 ** depth
+            depth += 1
+            if result["game_over"]:
+                # Safe moves cannot kill, so this is a full board: a win.
+                value = 1.0
+                break
+
+        if value is None:
+            value = self._rollout(sim, depth, apples)
+        for node, a in path:
+            node[0] += 1
+            node[1][a] += 1
+            node[2][a] += value
+
+    def choose(self, game: Game, budget_ms: Optional[float] = None) -> Optional[str]:
+        """Search until the budget runs out and return the most visited move."""
+        started = time.perf_counter()
+        deadline = started + (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        self._deadline = deadline
+        actions = safe_directions(game)
+        if len(actions) <= 1:
+            self.latencies.append(time.perf_counter() - started)
+            self.last_rollouts = 0
+            return actions[0] if actions else None
+
+        self._prepare(game)
+        game.snapshot_into(self._root_buf)
+        root_hash = self.zobrist.hash_game(game)
+        rollouts = 0
+        while True:
+            self._iterate(root_hash)
+            rollouts += 1
+            now = time.perf_counter()
+            # Stop when another iteration of average length would overrun;
+            # iterations also check the deadline themselves mid-rollout.
+            if now + (now - started) / rollouts >= deadline:
+                break
+
+        root = self.table.get(root_hash)
+        best = actions[0]
+        if root is not None:
+            best = max(actions, key=lambda name: root[1][Snake.DIRECTION_CODES[name]])
+        elapsed = time.perf_counter() - started
+        self.rollouts += rollouts
+        self.search_time += elapsed
+        self.last_rollouts = rollouts
+        self.latencies.append(elapsed)
+        self._deadline = math.inf
+        return best
+
+    def report(self) -> str:
+        if not self.latencies:
+            return "mcts: no decisions yet"
+        lat = sorted(self.latencies)
+        rate = self.rollouts / self.search_time if self.search_time else 0.0
+        return (f"mcts: {rate:.0f} rollouts/s, decision latency "
+                f"p50 {lat[len(lat) // 2] * 1000:.1f}ms "
+                f"max {lat[-1] * 1000:.1f}ms, table {len(self.table)}")
@@ -1,13 +1,24 @@
 # snake_gui.py
+import os
 import tkinter as tk
 import random
 import math
+import time
 from typing import Optional
-from snake_logic import Game
-from user_manager import load_users, create_user, update_high_score, get_high_score, has_users
+from analytics import STATS_DIR, GameRecorder, StatsStore
+from snake_logic import Game, EVENT_ATE, EVENT_SCORE_CHANGED, EVENT_DIED, EVENT_WON
+from snake_profiler import TickProfiler
+from snake_theme import (
+    CELL_SIZE, GRASS_BASE, GRASS_CHECKER, GRASS_COLORS, GRASS_FLOWER,
+    GRASS_SEED, GRASS_BLADES, GRASS_DOTS,
+    SNAKE_HEAD, SNAKE_OUTLINE, SNAKE_EYE_W, SNAKE_EYE_P, SNAKE_TONGUE,
+    APPLE_SHADOW, APPLE_BODY, APPLE_DARK, APPLE_HIGHLIGHT, APPLE_STEM, APPLE_LEAF,
+    body_colors,
+)
+from user_manager import (load_users, create_user, update_high_score, get_high_score, has_users,
+                          ScoreServerError)
 
 # ---- Configuration ------------------------------------------------
-CELL_SIZE = 24
 GRID_WIDTH = 30
 GRID_HEIGHT = 20
 GAME_SPEED = 130  # ms between steps
@@ -22,27 +33,7 @@ BTN_FG      = "#e0e0e0"
 BTN_HOVER   = "#1a5276"
 SCORE_CLR   = "#00d4aa"
 
-# ---- Grass palette ------------------------------------------------
-GRASS_BASE   = "#2d5a27"
-GRASS_COLORS = ["#1e4d2b", "#2d6a2e", "#3a7a3a", "#245522",
-                "#1b4d1b", "#336633"]
-GRASS_FLOWER = ["#dec04a", "#c776d5", "#bcd298"]
-
-# ---- Snake palette ------------------------------------------------
-SNAKE_HEAD       = "#7836e2"
-SNAKE_BODY_START = "#7836e2"
-SNAKE_BODY_END   = "#492386"
-SNAKE_OUTLINE    = "#000000"
-SNAKE_EYE_W      = "#ffffff"
-SNAKE_EYE_P      = "#1a1a1a"
-SNAKE_TONGUE     = "#ef4444"
-
-# ---- Apple palette ------------------------------------------------
-APPLE_BODY      = "#ef4444"
-APPLE_DARK      = "#dc2626"
-APPLE_HIGHLIGHT = "#fca5a5"
-APPLE_STEM      = "#78350f"
-APPLE_LEAF      = "#22c55e"
+# Board palettes (grass, snake, apple) live in snake_theme.
 
 # ---- Effect colours ------------------------------------------------
 EFFECT_COLORS = ["#fef08a", "#fde047", "#facc15", "#eab308",
@@ -51,8 +42,14 @@ EFFECT_COLORS = ["#fef08a", "#fde047", "#facc15", "#eab308",
 
 # ====================================================================
 class SnakeGUI:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, grid_width: int = GRID_WIDTH,
+                 grid_height: int = GRID_HEIGHT, game_speed: int = GAME_SPEED,
+                 bot=None):
         self.root = root
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.game_speed = game_speed
+        self.bot = bot  # optional callable(game) -> direction, replaces the keyboard
         self.root.title("\U0001f40d Snake")
         self.root.configure(bg=BG_COLOR)
 
@@ -64,14 +61,29 @@ class SnakeGUI:
         self.main_container.pack(fill="both", expand=True)
 
         # --- Game model ---
-        self.model = Game(GRID_WIDTH, GRID_HEIGHT, start_length=4)
-        self.direction_queue: Optional[str] = None
+        self.model = Game(grid_width, grid_height, start_length=4)
         self.after_id = None
+        self.best_score = 0
+        self.new_best = False
+        self.won = False
+        self.score_error: Optional[str] = None  # last score-server failure, shown in the HUD
+
+        # --- React to model events instead of polling every tick ---
+        self.model.subscribe(EVENT_ATE, self._on_ate)
+        self.model.subscribe(EVENT_SCORE_CHANGED, self._on_score_changed)
+        self.model.subscribe(EVENT_DIED, self._on_game_end)
+        self.model.subscribe(EVENT_WON, self._on_game_end)
+        self.model.subscribe(EVENT_WON, self._on_won)
+        self.recorder = GameRecorder(self.model, StatsStore())
 
         # --- Effect bookkeeping ---
         self.growth_effects: list = []
         self.effect_after_id = None
 
+        # --- Instrumentation (F3 toggles overlay, F4 exports) ---
+        self.profiler = TickProfiler(game_speed)
+        self.stats_ids: list = []
+
         # --- Show user menu first ---
         self._show_user_menu()
 
@@ -93,7 +105,7 @@ class SnakeGUI:
         tk.Label(f, text="\U0001f40d", font=("Segoe UI Emoji", 36),
                  bg=BG_COLOR).pack(pady=(0, 20))
 
-        users = load_users()
+        users = self._load_users_or_report(f)
 
         if users:
             tk.Label(f, text="Welcome! Choose an option:",
@@ -156,7 +168,7 @@ class SnakeGUI:
         tk.Label(f, text="Select a User", font=("Consolas", 20, "bold"),
                  bg=BG_COLOR, fg=SCORE_CLR).pack(pady=(30, 16))
 
-        users = load_users()
+        users = self._load_users_or_report(f)
 
         # Scrollable list frame
         list_outer = tk.Frame(f, bg=ACCENT, padx=2, pady=2)
@@ -288,11 +300,25 @@ class SnakeGUI:
         if len(username) > 20:
             self.create_error_label.config(text="Username must be 20 characters or less.")
             return
-        if not create_user(username):
+        try:
+            created = create_user(username)
+        except ScoreServerError as e:
+            self.create_error_label.config(text=f"Score server error: {e}")
+            return
+        if not created:
             self.create_error_label.config(text=f'User "{username}" already exists.')
             return
         self._select_user(username)
 
+    def _load_users_or_report(self, parent) -> dict:
+        """load_users(), or an empty dict plus an error line if the server fails."""
+        try:
+            return load_users()
+        except ScoreServerError as e:
+            tk.Label(parent, text=f"Score server error: {e}", font=("Consolas", 10),
+                     bg=BG_COLOR, fg="#ef4444").pack(pady=(0, 8))
+            return {}
+
     def _select_user(self, username: str):
         """Set current user and transition to the game screen."""
         self.current_user = username
@@ -306,10 +332,15 @@ class SnakeGUI:
         self._clear_container()
         f = self.main_container
 
-        canvas_w = GRID_WIDTH * CELL_SIZE
-        canvas_h = GRID_HEIGHT * CELL_SIZE
+        canvas_w = self.grid_width * CELL_SIZE
+        canvas_h = self.grid_height * CELL_SIZE
 
-        high = get_high_score(self.current_user)
+        self.score_error = None
+        try:
+            self.best_score = get_high_score(self.current_user)
+        except ScoreServerError as e:
+            self.best_score = 0
+            self.score_error = f"Score server error: {e}"
 
         # --- Title ---
         tk.Label(f, text="S N A K E", font=("Consolas", 20, "bold"),
@@ -328,10 +359,13 @@ class SnakeGUI:
 
         self.hud = tk.Label(hud_frame,
                             text=f"\U0001f464 {self.current_user}   |   "
-                                 f"Score: 0   |   Best: {high}",
+                                 f"Score: 0   |   Best: {self.best_score}",
                             font=("Consolas", 14, "bold"),
                             bg=BG_COLOR, fg=SCORE_CLR)
         self.hud.pack()
+        if self.score_error:
+            self._flash_hud(self.score_error, 5000)
+            self.score_error = None
 
         # --- Buttons ---
         btn_frame = tk.Frame(f, bg=BG_COLOR)
@@ -364,7 +398,7 @@ class SnakeGUI:
         btn_switch.bind("<Leave>",
             lambda e: btn_switch.config(bg=BTN_BG))
 
-        tk.Label(f, text="Arrow keys or WASD to move",
+        tk.Label(f, text="Arrow keys or WASD to move   |   F3 stats, F4 export",
                  font=("Consolas", 9), bg=BG_COLOR,
                  fg="#6b7280").pack(pady=(2, 10))
 
@@ -374,6 +408,9 @@ class SnakeGUI:
                        ("a", "Left"), ("d", "Right"),
                        ("w", "Up"), ("s", "Down")]:
             self.root.bind(key, lambda e, d=d: self.queue_direction(d))
+        self.root.bind("<F3>", lambda e: self._toggle_stats())
+        self.root.bind("<F4>", lambda e: self._export_stats())
+        self.stats_ids = []
 
         # --- Draw persistent grass layer ---
         self._draw_grass()
@@ -390,6 +427,7 @@ class SnakeGUI:
             self.root.after_cancel(self.effect_after_id)
             self.effect_after_id = None
         self.growth_effects = []
+        self.stats_ids = []
         self.current_user = None
         self._show_user_menu()
 
@@ -398,22 +436,22 @@ class SnakeGUI:
     # ----------------------------------------------------------------
     def _draw_grass(self):
         """Render a textured grassy field (drawn once, kept behind game items)."""
-        cw = GRID_WIDTH * CELL_SIZE
-        ch = GRID_HEIGHT * CELL_SIZE
+        cw = self.grid_width * CELL_SIZE
+        ch = self.grid_height * CELL_SIZE
 
         # subtle checkerboard
-        for gx in range(GRID_WIDTH):
-            for gy in range(GRID_HEIGHT):
+        for gx in range(self.grid_width):
+            for gy in range(self.grid_height):
                 x1 = gx * CELL_SIZE
                 y1 = gy * CELL_SIZE
-                color = "#2a5e2a" if (gx + gy) % 2 == 0 else "#276227"
+                color = GRASS_CHECKER[(gx + gy) % 2]
                 self.canvas.create_rectangle(
                     x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE,
                     fill=color, outline="", tags="grass")
 
         # random grass blades
-        rng = random.Random(42)
-        for _ in range(350):
+        rng = random.Random(GRASS_SEED)
+        for _ in range(GRASS_BLADES):
             bx = rng.randint(0, cw - 1)
             by = rng.randint(0, ch - 1)
             bl = rng.randint(3, 8)
@@ -423,7 +461,7 @@ class SnakeGUI:
                 fill=rng.choice(GRASS_COLORS), width=1, tags="grass")
 
         # small dot accents
-        for _ in range(35):
+        for _ in range(GRASS_DOTS):
             fx = rng.randint(4, cw - 4)
             fy = rng.randint(4, ch - 4)
             fs = rng.choice([1, 2])
@@ -442,7 +480,7 @@ class SnakeGUI:
         # shadow
         self.canvas.create_oval(
             cx - r + 2, cy - r + 3, cx + r + 2, cy + r + 3,
-            fill="#1a1a1a", outline="", stipple="gray25", tags="food")
+            fill=APPLE_SHADOW, outline="", stipple="gray25", tags="food")
         # body
         self.canvas.create_oval(
             cx - r, cy - r + 1, cx + r, cy + r + 1,
@@ -467,15 +505,6 @@ class SnakeGUI:
     # ----------------------------------------------------------------
     #  SNAKE DRAWING
     # ----------------------------------------------------------------
-    @staticmethod
-    def _lerp_color(hex1: str, hex2: str, t: float) -> str:
-        r1, g1, b1 = int(hex1[1:3], 16), int(hex1[3:5], 16), int(hex1[5:7], 16)
-        r2, g2, b2 = int(hex2[1:3], 16), int(hex2[3:5], 16), int(hex2[5:7], 16)
-        r = int(r1 + (r2 - r1) * t)
-        g = int(g1 + (g2 - g1) * t)
-        b = int(b1 + (b2 - b1) * t)
-        return f"#{r:02x}{g:02x}{b:02x}"
-
     def _draw_snake_head(self, gx: int, gy: int, direction: str):
         x1 = gx * CELL_SIZE + 1
         y1 = gy * CELL_SIZE + 1
@@ -532,10 +561,7 @@ class SnakeGUI:
         cx = gx * CELL_SIZE + CELL_SIZE // 2
         cy = gy * CELL_SIZE + CELL_SIZE // 2
 
-        t = i / max(total - 1, 1)
-        body_clr = self._lerp_color(SNAKE_BODY_START, SNAKE_BODY_END, t)
-        scale_clr = self._lerp_color(SNAKE_BODY_START, SNAKE_BODY_END,
-                                     max(t - 0.15, 0))
+        body_clr, scale_clr = body_colors(i, total)
 
         self.canvas.create_rectangle(
             x1, y1, x2, y2,
@@ -558,6 +584,9 @@ class SnakeGUI:
             self._animate_effects()
 
     def _animate_effects(self):
+        prof = self.profiler if self.profiler.enabled else None
+        if prof is not None:
+            t0 = time.perf_counter()
         still_active = []
         for eff in self.growth_effects:
             for eid in eff["ids"]:
@@ -591,6 +620,8 @@ class SnakeGUI:
             still_active.append(eff)
 
         self.growth_effects = still_active
+        if prof is not None:
+            prof.span("effects_anim", t0, time.perf_counter())
         if self.growth_effects:
             self.effect_after_id = self.root.after(40, self._animate_effects)
         else:
@@ -608,43 +639,83 @@ class SnakeGUI:
             self.effect_after_id = None
 
         self.model.reset()
-        high = get_high_score(self.current_user) if self.current_user else 0
-        self.hud.config(text=f"\U0001f464 {self.current_user}   |   "
-                             f"Score: 0   |   Best: {high}")
+        self.recorder.begin(self.current_user or "")
+        self.new_best = False
+        self.won = False
+        self._update_hud()
         self.canvas.delete("snake")
         self.canvas.delete("food")
         self.canvas.delete("effect")
         self.canvas.delete("overlay")
         self.growth_effects = []
-        self.direction_queue = None
         self.start_button.config(text="\u27F3  RESTART")
         self._game_loop()
 
     def queue_direction(self, d: str):
-        self.direction_queue = d
+        self.model.queue_input(d, time.perf_counter())
 
     def _game_loop(self):
         if not self.model.is_running():
             self.game_over()
             return
+        tick_start = time.perf_counter()
 
-        result = self.model.step(direction=self.direction_queue)
-        self.direction_queue = None
+        prof = self.profiler if self.profiler.enabled else None
+        if prof is not None:
+            prof.begin_tick()
 
-        if result.get("ate"):
-            head = self.model.get_snake_positions()[0]
-            self._trigger_growth_effect(*head)
+        direction = self.bot(self.model) if self.bot is not None else None
+        result = self.model.step(direction=direction)
+        input_time = self.model.applied_input_time
+        if prof is not None:
+            prof.lap("step")
 
         self.draw()
-        high = get_high_score(self.current_user) if self.current_user else 0
-        self.hud.config(text=f"\U0001f464 {self.current_user}   |   "
-                             f"Score: {self.model.score}   |   Best: {high}")
+        if prof is not None:
+            prof.lap("draw")
+            latency = None if input_time is None else time.perf_counter() - input_time
+            prof.end_tick(len(self.canvas.find_all()), latency)
+            self._draw_stats_overlay()
 
         if result["game_over"]:
             self.game_over()
             return
 
-        self.after_id = self.root.after(GAME_SPEED, self._game_loop)
+        delay = self.game_speed
+        if self.bot is not None:
+            # Search time counts against the tick, so a bot keeps the pace.
+            delay = max(1, self.game_speed - int((time.perf_counter() - tick_start) * 1000))
+        self.after_id = self.root.after(delay, self._game_loop)
+
+    # ----------------------------------------------------------------
+    #  MODEL EVENTS
+    # ----------------------------------------------------------------
+    def _update_hud(self):
+        self.hud.config(text=f"\U0001f464 {self.current_user}   |   "
+                             f"Score: {self.model.score}   |   Best: {self.best_score}")
+
+    def _on_ate(self, event):
+        self._trigger_growth_effect(*event.position)
+
+    def _on_score_changed(self, event):
+        self._update_hud()
+
+    def _on_won(self, event):
+        self.won = True
+
+    def _on_game_end(self, event):
+        """Save the high score once, when the game ends."""
+        if self.current_user:
+            # Runs inside Game.step(): a server failure must not abort the
+            # tick, or the game-over screen and the stats log are skipped.
+            try:
+                self.new_best = update_high_score(self.current_user, event.score)
+            except ScoreServerError as e:
+                self.new_best = False
+                self.score_error = f"Score not saved: {e}"
+                return
+            if self.new_best:
+                self.best_score = event.score
 
     # ----------------------------------------------------------------
     #  DRAW (called every tick)
@@ -667,17 +738,55 @@ class SnakeGUI:
             else:
                 self._draw_snake_body(i, gx, gy, len(snake))
 
+    # ----------------------------------------------------------------
+    #  STATS OVERLAY
+    # ----------------------------------------------------------------
+    def _toggle_stats(self):
+        if not self.profiler.toggle() and self.stats_ids:
+            self.canvas.delete("stats")
+            self.stats_ids = []
+
+    def _draw_stats_overlay(self):
+        """Show FPS, tick jitter and phase timings in the top-left corner."""
+        text = "\n".join(self.profiler.overlay_lines())
+        if not self.stats_ids:
+            bg = self.canvas.create_rectangle(
+                4, 4, 220, 92, fill="#000000", stipple="gray50",
+                outline="", tags="stats")
+            txt = self.canvas.create_text(
+                10, 8, anchor="nw", text=text, fill=SCORE_CLR,
+                font=("Consolas", 9), tags="stats")
+            self.stats_ids = [bg, txt]
+        else:
+            self.canvas.itemconfig(self.stats_ids[1], text=text)
+        self.canvas.tag_raise("stats")
+
+    def _export_stats(self):
+        """Dump recorded ticks as CSV and Chrome trace-event JSON."""
+        if not self.profiler.ticks:
+            return
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        try:
+            self.profiler.export_csv(os.path.join(STATS_DIR, f"snake_ticks_{stamp}.csv"))
+            self.profiler.export_chrome_trace(
+                os.path.join(STATS_DIR, f"snake_trace_{stamp}.json"))
+        except OSError as e:
+            self._flash_hud(f"Export failed: {e}")
+            return
+        self._flash_hud(f"Exported snake_ticks_{stamp}.csv / snake_trace_{stamp}.json")
+
+    def _flash_hud(self, text: str, ms: int = 3000):
+        """Show a message in the HUD, then go back to the score line."""
+        self.hud.config(text=text)
+        hud = self.hud
+        self.root.after(ms, lambda: hud.winfo_exists() and self._update_hud())
+
     # ----------------------------------------------------------------
     #  GAME OVER OVERLAY
     # ----------------------------------------------------------------
     def game_over(self):
-        # Save high score
-        new_best = False
-        if self.current_user:
-            new_best = update_high_score(self.current_user, self.model.score)
-
-        w = GRID_WIDTH * CELL_SIZE
-        h = GRID_HEIGHT * CELL_SIZE
+        w = self.grid_width * CELL_SIZE
+        h = self.grid_height * CELL_SIZE
 
         # dim overlay
         self.canvas.create_rectangle(
@@ -692,29 +801,31 @@ class SnakeGUI:
             fill=PANEL_BG, outline=ACCENT, width=2, tags="overlay")
 
         self.canvas.create_text(
-            w // 2, h // 2 - 35, text="GAME OVER",
-            fill="#ef4444", font=("Consolas", 22, "bold"), tags="overlay")
+            w // 2, h // 2 - 35, text="YOU WIN!" if self.won else "GAME OVER",
+            fill=SCORE_CLR if self.won else "#ef4444",
+            font=("Consolas", 22, "bold"), tags="overlay")
         self.canvas.create_text(
             w // 2, h // 2 - 5, text=f"Score: {self.model.score}",
             fill=SCORE_CLR, font=("Consolas", 14), tags="overlay")
-        if new_best:
+        if self.new_best:
             self.canvas.create_text(
                 w // 2, h // 2 + 18,
                 text="\u2B50 NEW HIGH SCORE! \u2B50",
                 fill="#fde047", font=("Consolas", 12, "bold"), tags="overlay")
         else:
-            best = get_high_score(self.current_user) if self.current_user else 0
             self.canvas.create_text(
-                w // 2, h // 2 + 18, text=f"Best: {best}",
+                w // 2, h // 2 + 18, text=f"Best: {self.best_score}",
                 fill=TEXT_COLOR, font=("Consolas", 11), tags="overlay")
         self.canvas.create_text(
             w // 2, h // 2 + 42, text="Press RESTART to play again",
             fill="#6b7280", font=("Consolas", 9), tags="overlay")
 
         # Update HUD with latest high score
-        high = get_high_score(self.current_user) if self.current_user else 0
-        self.hud.config(text=f"\U0001f464 {self.current_user}   |   "
-                             f"Score: {self.model.score}   |   Best: {high}")
+        if self.score_error:
+            self._flash_hud(self.score_error, 5000)
+            self.score_error = None
+        else:
+            self._update_hud()
 
 
 # ====================================================================
@@ -1,9 +1,17 @@
 # snake_logic.py
 import random
-from typing import List, Tuple, Optional
+import struct
+from array import array
+from typing import Callable, Dict, List, NamedTuple, Tuple, Optional, Union
 
 Point = Tuple[int, int]
 
+_MASK64 = (1 << 64) - 1
+
+# Snapshot header: rng state, score, body length, food x/y, running,
+# direction, next_direction. The body follows as flat cell indices.
+_SNAPSHOT_HEADER = struct.Struct("<QIIhhBBB")
+
 
 class Snake:
     DIRECTIONS = {
@@ -20,6 +28,9 @@ class Snake:
         "Down": "Up",
     }
 
+    DIRECTION_NAMES = ("Left", "Right", "Up", "Down")
+    DIRECTION_CODES = {name: i for i, name in enumerate(DIRECTION_NAMES)}
+
     def __init__(self, start: Point, start_length: int = 4, start_dir: str = "Right"):
         cx, cy = start
         self.body: List[Point] = [(cx - i, cy) for i in range(start_length)]  # head at index 0
@@ -52,42 +63,198 @@ class Snake:
         return head in self.body[1:]
 
 
+# ---- Game events ----------------------------------------------------
+EVENT_MOVED = "moved"
+EVENT_ATE = "ate"
+EVENT_SCORE_CHANGED = "score_changed"
+EVENT_DIED = "died"
+EVENT_WON = "won"
+
+
+class MovedEvent(NamedTuple):
+    head: Point
+    tail: Optional[Point]  # cell vacated this tick, None when the snake grew
+    direction: str
+
+
+class AteEvent(NamedTuple):
+    position: Point
+    next_food: Optional[Point]
+
+
+class ScoreChangedEvent(NamedTuple):
+    old: int
+    new: int
+
+
+class DiedEvent(NamedTuple):
+    cause: str       # "wall" or "self"
+    score: int
+    direction: str   # the move that killed the snake
+
+
+class WonEvent(NamedTuple):
+    score: int
+
+
+class InputBuffer:
+    """
+    Bounded ring buffer of pending turns, consumed one per tick.
+
+    Inputs that would repeat the previously queued direction, or reverse it,
+    are dropped at push time so a fast double-tap (e.g. Up then Left within
+    one tick) turns twice over two ticks instead of losing a key.
+    """
+
+    def __init__(self, capacity: int = 3):
+        self.capacity = capacity
+        self._dirs: List[Optional[str]] = [None] * capacity
+        self._times: List[Optional[float]] = [None] * capacity
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+
+    def last(self) -> Optional[str]:
+        if not self._count:
+            return None
+        return self._dirs[(self._start + self._count - 1) % self.capacity]
+
+    def push(self, direction: str, reference: str, timestamp: Optional[float] = None,
+             allow_reverse: bool = False) -> bool:
+        """
+        Queue `direction`. `reference` is the heading it is judged against when
+        nothing is queued yet. Returns False if the input was dropped.
+        """
+        prev = self.last() or reference
+        if direction == prev:
+            return False
+        if not allow_reverse and Snake.OPPOSITE[direction] == prev:
+            return False
+        if self._count == self.capacity:
+            return False
+        slot = (self._start + self._count) % self.capacity
+        self._dirs[slot] = direction
+        self._times[slot] = timestamp
+        self._count += 1
+        return True
+
+    def pop(self) -> Tuple[Optional[str], Optional[float]]:
+        """Remove the oldest input. Returns (direction, timestamp)."""
+        if not self._count:
+            return None, None
+        slot = self._start
+        self._start = (slot + 1) % self.capacity
+        self._count -= 1
+        return self._dirs[slot], self._times[slot]
+
+
 class Game:
-    def __init__(self, grid_width: int, grid_height: int, start_length: int = 4):
+    def __init__(self, grid_width: int, grid_height: int, start_length: int = 4,
+                 seed: Optional[int] = None):
         self.grid_width = grid_width
         self.grid_height = grid_height
         self.start_length = start_length
+        # xorshift64* state: one int, so snapshots can carry it for free.
+        # Seeded games replay identically.
+        self.rng_state = Game._seed_state(seed)
+        self.inputs = InputBuffer()
+        self.applied_input_time: Optional[float] = None
+        # event name -> callbacks; names with no subscribers are absent, so
+        # step() only pays a dict lookup per event when nobody listens.
+        self._listeners: Dict[str, List[Callable]] = {}
         self.score = 0
         self.snake: Optional[Snake] = None
         self.food: Optional[Point] = None
         self.running = False
+        self._cell_type = "H" if grid_width * grid_height <= 0x10000 else "I"
+        self._cell_points: Optional[List[Point]] = None
         self.reset()
 
+    @staticmethod
+    def _seed_state(seed: Optional[int]) -> int:
+        if seed is None:
+            return random.getrandbits(64) | 1
+        # splitmix64 so that nearby seeds give unrelated streams
+        z = (seed + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return (z ^ (z >> 31)) or 1
+
+    def _rand_below(self, n: int) -> int:
+        x = self.rng_state
+        x ^= x >> 12
+        x ^= (x << 25) & _MASK64
+        x ^= x >> 27
+        self.rng_state = x
+        return (((x * 0x2545F4914F6CDD1D) & _MASK64) >> 32) * n >> 32
+
     def reset(self):
         cx = self.grid_width // 2
         cy = self.grid_height // 2
         self.snake = Snake((cx, cy), start_length=self.start_length, start_dir="Right")
+        old_score = self.score
         self.score = 0
         self.running = True
+        self.inputs.clear()
+        self.applied_input_time = None
         self.place_food()
+        if old_score and EVENT_SCORE_CHANGED in self._listeners:
+            self._emit(EVENT_SCORE_CHANGED, ScoreChangedEvent(old_score, 0))
+
+    # ----------------------------------------------------------------
+    #  EVENTS
+    # ----------------------------------------------------------------
+    def subscribe(self, event: str, callback: Callable) -> Callable:
+        """Call `callback(payload)` whenever `event` fires. Returns `callback`."""
+        self._listeners.setdefault(event, []).append(callback)
+        return callback
+
+    def unsubscribe(self, event: str, callback: Callable):
+        callbacks = self._listeners.get(event)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._listeners[event]
+
+    def _emit(self, event: str, payload):
+        for callback in self._listeners.get(event, ()):
+            callback(payload)
 
     def place_food(self):
+        occupied = set(self.snake.body)
         free_cells = [
             (x, y)
             for x in range(self.grid_width)
             for y in range(self.grid_height)
-            if (x, y) not in self.snake.body
+            if (x, y) not in occupied
         ]
         if not free_cells:
             # No free cell: player wins / no food
             self.food = None
             return
-        self.food = random.choice(free_cells)
+        self.food = free_cells[self._rand_below(len(free_cells))]
+
+    def queue_input(self, direction: str, timestamp: Optional[float] = None) -> bool:
+        """
+        Buffer a direction for a later tick (one turn is applied per tick).
+        Returns False if it was dropped as redundant, a reversal, or overflow.
+        """
+        if direction not in Snake.DIRECTIONS:
+            return False
+        return self.inputs.push(direction, self.snake.next_direction, timestamp,
+                                allow_reverse=len(self.snake.body) <= 1)
 
     def step(self, direction: Optional[str] = None) -> dict:
         """
         Advance game by one tick.
-        :param direction: optional direction requested by player (e.g., "Left")
+        :param direction: optional direction requested by player (e.g., "Left");
+            when omitted, the oldest input from `queue_input` is applied
         :return: dict with keys:
             - 'alive': bool
             - 'ate': bool
@@ -97,40 +264,119 @@ class Game:
         if not self.running:
             return {"alive": False, "ate": False, "game_over": True, "score": self.score}
 
+        self.applied_input_time = None
+        if direction is None and len(self.inputs):
+            direction, self.applied_input_time = self.inputs.pop()
         if direction:
             self.snake.set_direction(direction)
 
         new_head = self.snake.next_head()
         nx, ny = new_head
 
+        listeners = self._listeners
+
         # Check wall collisions
         if nx < 0 or ny < 0 or nx >= self.grid_width or ny >= self.grid_height:
-            self.running = False
-            return {"alive": False, "ate": False, "game_over": True, "score": self.score}
+            return self._die("wall")
 
         # Check self-collision (note tail will vacate unless growing)
         # We'll simulate growth check by seeing if new_head is in body except the tail
         body_without_tail = self.snake.body[:-1]
         if new_head in body_without_tail:
-            self.running = False
-            return {"alive": False, "ate": False, "game_over": True, "score": self.score}
+            return self._die("self")
 
         ate = (self.food is not None and new_head == self.food)
+        tail = self.snake.body[-1]
 
         # Advance snake (grow if ate)
         self.snake.advance(grow=ate)
-
+        won = False
         if ate:
             self.score += 10
             self.place_food()
+            won = self.food is None  # board is full: nothing left to eat
 
         # Additional safety: detect self-collision after move
-        if self.snake.collides_with_self():
+        crashed = not won and self.snake.collides_with_self()
+        if won or crashed:
             self.running = False
-            return {"alive": False, "ate": ate, "game_over": True, "score": self.score}
 
+        # The state is final now; only then tell subscribers, so they never
+        # see a half-updated game (and a raising one cannot leave it so).
+        if EVENT_MOVED in listeners:
+            self._emit(EVENT_MOVED, MovedEvent(new_head, None if ate else tail,
+                                               self.snake.direction))
+        if ate:
+            if EVENT_ATE in listeners:
+                self._emit(EVENT_ATE, AteEvent(new_head, self.food))
+            if EVENT_SCORE_CHANGED in listeners:
+                self._emit(EVENT_SCORE_CHANGED, ScoreChangedEvent(self.score - 10, self.score))
+        if won:
+            if EVENT_WON in listeners:
+                self._emit(EVENT_WON, WonEvent(self.score))
+            return {"alive": True, "ate": True, "game_over": True, "score": self.score}
+        if crashed:
+            result = self._die("self")
+            result["ate"] = ate
+            return result
         return {"alive": True, "ate": ate, "game_over": False, "score": self.score}
 
+    def _die(self, cause: str) -> dict:
+        self.running = False
+        if EVENT_DIED in self._listeners:
+            self._emit(EVENT_DIED, DiedEvent(cause, self.score, self.snake.next_direction))
+        return {"alive": False, "ate": False, "game_over": True, "score": self.score}
+
+    # ----------------------------------------------------------------
+    #  SNAPSHOTS
+    # ----------------------------------------------------------------
+    def snapshot_size(self) -> int:
+        """Upper bound, in bytes, of any snapshot of this game."""
+        cells = self.grid_width * self.grid_height
+        return _SNAPSHOT_HEADER.size + array(self._cell_type).itemsize * cells
+
+    def snapshot_into(self, buf: bytearray, offset: int = 0) -> int:
+        """Encode the game state into `buf` at `offset`. Returns bytes written."""
+        w = self.grid_width
+        snake = self.snake
+        food = self.food or (-1, -1)
+        cells = array(self._cell_type, [x + y * w for x, y in snake.body])
+        _SNAPSHOT_HEADER.pack_into(
+            buf, offset, self.rng_state, self.score, len(cells), food[0], food[1],
+            self.running, Snake.DIRECTION_CODES[snake.direction],
+            Snake.DIRECTION_CODES[snake.next_direction])
+        start = offset + _SNAPSHOT_HEADER.size
+        end = start + len(cells) * cells.itemsize
+        buf[start:end] = cells
+        return end - offset
+
+    def restore_from(self, buf: Union[bytes, bytearray], offset: int = 0):
+        """Load state written by `snapshot_into`. Pending inputs are discarded."""
+        (self.rng_state, self.score, n, fx, fy, running,
+         d, nd) = _SNAPSHOT_HEADER.unpack_from(buf, offset)
+        cells = array(self._cell_type)
+        start = offset + _SNAPSHOT_HEADER.size
+        cells.frombytes(memoryview(buf)[start:start + n * cells.itemsize])
+        points = self._cell_points
+        if points is None:
+            w = self.grid_width
+            points = self._cell_points = [
+                (i % w, i // w) for i in range(w * self.grid_height)]
+        self.snake.body = [points[i] for i in cells]
+        self.snake.direction = Snake.DIRECTION_NAMES[d]
+        self.snake.next_direction = Snake.DIRECTION_NAMES[nd]
+        self.food = None if fx < 0 else (fx, fy)
+        self.running = bool(running)
+        self.inputs.clear()
+        self.applied_input_time = None
+
+    def snapshot(self) -> bytes:
+        buf = bytearray(self.snapshot_size())
+        return bytes(buf[:self.snapshot_into(buf)])
+
+    def restore(self, blob: bytes):
+        self.restore_from(blob)
+
     # Helper accessors for GUI
     def get_snake_positions(self) -> List[Point]:
         return list(self.snake.body)
@@ -140,3 +386,222 @@ class Game:
 
     def is_running(self) -> bool:
         return self.running
+
+
+class RewindBuffer:
+    """
+    Fixed-size ring of per-tick `Game` snapshots.
+
+    All slots live in one preallocated bytearray, so recording and rewinding
+    allocate no per-tick buffers and memory stays at capacity * slot size.
+    """
+
+    def __init__(self, game: Game, capacity: int):
+        self.game = game
+        self.capacity = capacity
+        self.slot_size = game.snapshot_size()
+        self._buf = bytearray(capacity * self.slot_size)
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+
+    def record(self):
+        """Store the game's current state, overwriting the oldest when full."""
+        if self._count == self.capacity:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        else:
+            slot = (self._start + self._count) % self.capacity
+            self._count += 1
+        self.game.snapshot_into(self._buf, slot * self.slot_size)
+
+    def rewind(self, ticks: int = 1) -> int:
+        """
+        Restore the state recorded `ticks` records before the newest one and
+        forget everything after it. Returns how many ticks were rewound
+        (fewer than asked when the history is shorter).
+        """
+        if not self._count:
+            return 0
+        ticks = max(0, min(ticks, self._count - 1))
+        self._count -= ticks
+        slot = (self._start + self._count - 1) % self.capacity
+        self.game.restore_from(self._buf, slot * self.slot_size)
+        return ticks
+
+
+class Arena:
+    """
+    Many snakes sharing one large grid with several food items.
+
+    All snakes move simultaneously each tick. Collisions are resolved through
+    a flat occupancy grid (cell index -> snake id + 1, 0 when empty), so a tick
+    costs O(number of snakes) instead of comparing every segment pair.
+    A free-cell index (swap-remove list + position table) keeps food spawning
+    O(1) no matter how crowded the board gets.
+    """
+
+    def __init__(self, grid_width: int, grid_height: int, food_count: int = 1,
+                 rng: Optional[random.Random] = None):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.food_count = food_count
+        self.rng = rng if rng is not None else random.Random()
+        self.snakes: List[Snake] = []
+        self.alive: List[bool] = []
+        self.scores: List[int] = []
+        self.food: set = set()  # cell indices
+        self.ticks = 0
+
+        size = grid_width * grid_height
+        self._occ: List[int] = [0] * size
+        self._free: List[int] = list(range(size))
+        self._free_pos: List[int] = list(range(size))
+
+    # -- cell helpers -------------------------------------------------
+    def _index(self, p: Point) -> int:
+        return p[1] * self.grid_width + p[0]
+
+    def _point(self, idx: int) -> Point:
+        return (idx % self.grid_width, idx // self.grid_width)
+
+    def _take_free(self, idx: int):
+        pos = self._free_pos[idx]
+        last = self._free.pop()
+        if last != idx:
+            self._free[pos] = last
+            self._free_pos[last] = pos
+        self._free_pos[idx] = -1
+
+    def _give_free(self, idx: int):
+        self._free_pos[idx] = len(self._free)
+        self._free.append(idx)
+
+    def is_free(self, p: Point) -> bool:
+        x, y = p
+        if x < 0 or y < 0 or x >= self.grid_width or y >= self.grid_height:
+            return False
+        return self._free_pos[self._index(p)] != -1
+
+    def free_cell_count(self) -> int:
+        return len(self._free)
+
+    # -- population ---------------------------------------------------
+    def add_snake(self, start: Point, start_length: int = 4,
+                  start_dir: str = "Right") -> int:
+        """Place a snake with its head at `start`. Returns the snake id."""
+        snake = Snake(start, start_length=1, start_dir=start_dir)
+        dx, dy = Snake.DIRECTIONS[start_dir]
+        snake.body = [(start[0] - dx * i, start[1] - dy * i) for i in range(start_length)]
+        for p in snake.body:
+            if not self.is_free(p):
+                raise ValueError(f"cannot place snake at {start}: cell {p} is taken")
+
+        sid = len(self.snakes)
+        for p in snake.body:
+            idx = self._index(p)
+            self._take_free(idx)
+            self._occ[idx] = sid + 1
+        self.snakes.append(snake)
+        self.alive.append(True)
+        self.scores.append(0)
+        return sid
+
+    def spawn_snake(self, start_length: int = 4, attempts: int = 100) -> Optional[int]:
+        """Add a snake at a random free spot. Returns None if none was found."""
+        for _ in range(attempts):
+            if not self._free:
+                return None
+            head = self._point(self.rng.choice(self._free))
+            start_dir = self.rng.choice(list(Snake.DIRECTIONS))
+            try:
+                return self.add_snake(head, start_length, start_dir)
+            except ValueError:
+                continue
+        return None
+
+    def set_direction(self, sid: int, new_dir: str):
+        if self.alive[sid]:
+            self.snakes[sid].set_direction(new_dir)
+
+    def place_food(self):
+        """Top the board up to `food_count` food items."""
+        while len(self.food) < self.food_count and self._free:
+            idx = self.rng.choice(self._free)
+            self._take_free(idx)
+            self.food.add(idx)
+
+    # -- simulation ---------------------------------------------------
+    def step(self) -> dict:
+        """
+        Advance every live snake by one tick, simultaneously.
+        :return: dict with keys:
+            - 'ate': list of snake ids that ate this tick
+            - 'died': list of snake ids that died this tick
+            - 'alive': number of snakes still alive
+        """
+        w, h = self.grid_width, self.grid_height
+        occ = self._occ
+
+        # 1. Work out every move and which tails will vacate.
+        moves = []  # (sid, new_head index or -1, ate)
+        claims = {}
+        vacating = set()
+        for sid, snake in enumerate(self.snakes):
+            if not self.alive[sid]:
+                continue
+            nx, ny = snake.next_head()
+            if nx < 0 or ny < 0 or nx >= w or ny >= h:
+                moves.append((sid, -1, False))
+                continue
+            idx = ny * w + nx
+            ate = idx in self.food
+            if not ate:
+                vacating.add(self._index(snake.body[-1]))
+            claims[idx] = claims.get(idx, 0) + 1
+            moves.append((sid, idx, ate))
+
+        # 2. Resolve collisions against the occupancy grid.
+        died = []
+        survivors = []
+        for sid, idx, ate in moves:
+            if (idx == -1 or claims[idx] > 1
+                    or (occ[idx] and idx not in vacating)):
+                died.append(sid)
+            else:
+                survivors.append((sid, idx, ate))
+
+        # 3. Clear dead bodies and vacated tails, then claim the new heads.
+        for sid in died:
+            self.alive[sid] = False
+            for p in self.snakes[sid].body:
+                cell = self._index(p)
+                occ[cell] = 0
+                self._give_free(cell)
+        for sid, idx, ate in survivors:
+            snake = self.snakes[sid]
+            if not ate:
+                tail = self._index(snake.body[-1])
+                occ[tail] = 0
+                self._give_free(tail)
+            snake.advance(grow=ate)
+
+        ate_ids = []
+        for sid, idx, ate in survivors:
+            if ate:
+                self.food.discard(idx)
+                self.scores[sid] += 10
+                ate_ids.append(sid)
+            else:
+                self._take_free(idx)
+            occ[idx] = sid + 1
+
+        self.ticks += 1
+        self.place_food()
+        return {"ate": ate_ids, "died": died, "alive": sum(self.alive)}
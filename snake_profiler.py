@@ -0,0 +1,142 @@
+# snake_profiler.py
+import csv
+import json
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+
+class TickRecord(NamedTuple):
+    start: float              # perf_counter() at the start of the tick
+    interval: float           # seconds since the previous tick started
+    phases: Dict[str, float]  # phase name -> seconds
+    canvas_items: int
+    alloc_blocks: int         # change in allocated memory blocks over the tick
+    input_latency: Optional[float]  # keypress -> drawn, if an input was applied
+
+
+class TickProfiler:
+    """
+    Per-tick timing for the game loop.
+
+    Callers bracket a tick with `begin_tick()` / `end_tick()` and call
+    `lap(phase)` after each phase. Nothing is recorded while `enabled` is
+    False; the GUI checks the flag once per tick so the disabled cost is a
+    single attribute lookup.
+    """
+
+    # "step" includes the model's event handlers (effects, HUD updates).
+    PHASES = ("step", "draw")
+
+    def __init__(self, target_interval_ms: int, history: int = 5000, window: int = 60):
+        self.target_interval = target_interval_ms / 1000.0
+        self.window = window
+        self.enabled = False
+        self.ticks: Deque[TickRecord] = deque(maxlen=history)
+        self.spans: Deque[Tuple[str, float, float]] = deque(maxlen=history * 6)
+        self._tick_start = 0.0
+        self._last_tick_start: Optional[float] = None
+        self._lap_start = 0.0
+        self._phases: Dict[str, float] = {}
+        self._alloc_start = 0
+
+    def toggle(self) -> bool:
+        self.enabled = not self.enabled
+        self._last_tick_start = None
+        return self.enabled
+
+    # -- recording ----------------------------------------------------
+    def begin_tick(self):
+        now = time.perf_counter()
+        self._tick_start = self._lap_start = now
+        self._phases = {}
+        self._alloc_start = sys.getallocatedblocks()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self._phases[phase] = now - self._lap_start
+        self.spans.append((phase, self._lap_start, now - self._lap_start))
+        self._lap_start = now
+
+    def end_tick(self, canvas_items: int = 0, input_latency: Optional[float] = None):
+        start = self._tick_start
+        prev = self._last_tick_start
+        interval = start - prev if prev is not None else self.target_interval
+        self._last_tick_start = start
+        self.ticks.append(TickRecord(start, interval, self._phases, canvas_items,
+                                     sys.getallocatedblocks() - self._alloc_start,
+                                     input_latency))
+
+    def span(self, name: str, start: float, end: float):
+        """Record work that happens outside the tick (e.g. effect animation)."""
+        self.spans.append((name, start, end - start))
+
+    # -- summaries ----------------------------------------------------
+    def _recent(self) -> List[TickRecord]:
+        n = min(self.window, len(self.ticks))
+        return [self.ticks[-i] for i in range(n, 0, -1)]
+
+    def fps(self) -> float:
+        recent = self._recent()
+        total = sum(r.interval for r in recent)
+        return len(recent) / total if total > 0 else 0.0
+
+    def jitter_ms(self) -> float:
+        """Mean absolute deviation of the tick interval from its target."""
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        dev = sum(abs(r.interval - self.target_interval) for r in recent)
+        return dev / len(recent) * 1000
+
+    def phase_means_ms(self) -> Dict[str, float]:
+        recent = self._recent()
+        means = {}
+        for phase in self.PHASES:
+            values = [r.phases[phase] for r in recent if phase in r.phases]
+            means[phase] = sum(values) / len(values) * 1000 if values else 0.0
+        return means
+
+    def input_latency_ms(self) -> float:
+        """Mean keypress-to-draw latency over recent ticks that applied an input."""
+        values = [r.input_latency for r in self._recent() if r.input_latency is not None]
+        return sum(values) / len(values) * 1000 if values else 0.0
+
+    def overlay_lines(self) -> List[str]:
+        last = self.ticks[-1] if self.ticks else None
+        lines = [f"FPS {self.fps():5.1f}   jitter {self.jitter_ms():5.1f} ms"]
+        for phase, ms in self.phase_means_ms().items():
+            lines.append(f"{phase:<8}{ms:7.2f} ms")
+        lines.append(f"input   {self.input_latency_ms():7.1f} ms")
+        if last is not None:
+            lines.append(f"items {last.canvas_items}   allocs {last.alloc_blocks:+d}")
+        return lines
+
+    # -- export -------------------------------------------------------
+    def export_csv(self, path: str):
+        """Write one row per recorded tick."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["start_s", "interval_ms"]
+                            + [f"{p}_ms" for p in self.PHASES]
+                            + ["canvas_items", "alloc_blocks", "input_latency_ms"])
+            for r in self.ticks:
+                writer.writerow([f"{r.start:.6f}", f"{r.interval * 1000:.3f}"]
+                                + [f"{r.phases.get(p, 0.0) * 1000:.3f}" for p in self.PHASES]
+                                + [r.canvas_items, r.alloc_blocks,
+                                   "" if r.input_latency is None
+                                   else f"{r.input_latency * 1000:.3f}"])
+
+    def export_chrome_trace(self, path: str):
+        """Write a trace-event JSON file (chrome://tracing, Perfetto)."""
+        events = [{"name": name, "ph": "X", "pid": 1, "tid": 1,
+                   "ts": start * 1e6, "dur": dur * 1e6}
+                  for name, start, dur in self.spans]
+        for r in self.ticks:
+            events.append({"name": "counters", "ph": "C", "pid": 1, "tid": 1,
+                           "ts": r.start * 1e6,
+                           "args": {"canvas_items": r.canvas_items,
+                                    "alloc_blocks": r.alloc_blocks}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
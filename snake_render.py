@@ -0,0 +1,471 @@
+# snake_render.py
+"""
+Offscreen renderer: draws a `Game` into a NumPy RGB framebuffer.
+
+Mirrors the Tk visuals (_draw_grass, _draw_apple, _draw_snake_head,
+_draw_snake_body) without needing a display. Every sprite is rasterized
+once into a 3x3-cell RGBA tile centred on its own cell, so the head's
+tongue and the apple's stem/leaf can spill into neighbouring cells. Each
+frame only the cells whose content changed are restored from the grass
+background and re-composited.
+
+Requires NumPy. GIF export additionally requires Pillow.
+"""
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from snake_logic import Game, Point
+from snake_theme import (
+    CELL_SIZE, GRASS_CHECKER, GRASS_COLORS, GRASS_FLOWER,
+    GRASS_SEED, GRASS_BLADES, GRASS_DOTS,
+    SNAKE_HEAD, SNAKE_OUTLINE, SNAKE_EYE_W, SNAKE_EYE_P, SNAKE_TONGUE,
+    APPLE_SHADOW, APPLE_BODY, APPLE_DARK, APPLE_HIGHLIGHT, APPLE_STEM, APPLE_LEAF,
+    body_colors,
+)
+
+STIPPLE_GRAY25 = 64  # alpha used for Tk's "gray25" stipple
+
+
+def _rgb(color: str) -> Tuple[int, int, int]:
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+# ====================================================================
+#  SPRITE RASTERIZATION
+# ====================================================================
+class _Layer:
+    """A small RGBA canvas with Tk-like primitives in cell-local coordinates."""
+
+    def __init__(self, width: int, height: int, origin_x: float, origin_y: float):
+        self.rgb = np.zeros((height, width, 3), np.float32)
+        self.alpha = np.zeros((height, width), np.float32)
+        # pixel-centre coordinates, shifted so (0, 0) is the owning cell's corner
+        ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+        self.x = xs + 0.5 - origin_x
+        self.y = ys + 0.5 - origin_y
+
+    def paint(self, mask: np.ndarray, color: str, alpha: int = 255):
+        a = alpha / 255.0
+        rgb = np.array(_rgb(color), np.float32)
+        self.rgb[mask] = self.rgb[mask] * (1 - a) + rgb * a
+        self.alpha[mask] = self.alpha[mask] * (1 - a) + a
+
+    def rectangle(self, x1, y1, x2, y2, fill: str, outline: Optional[str] = None,
+                  width: float = 1.0):
+        x, y = self.x, self.y
+        if outline:
+            hw = width / 2.0
+            outer = (x >= x1 - hw) & (x <= x2 + hw) & (y >= y1 - hw) & (y <= y2 + hw)
+            self.paint(outer, outline)
+            x1, y1, x2, y2 = x1 + hw, y1 + hw, x2 - hw, y2 - hw
+        self.paint((x >= x1) & (x <= x2) & (y >= y1) & (y <= y2), fill)
+
+    def oval(self, x1, y1, x2, y2, fill: Optional[str], outline: Optional[str] = None,
+             width: float = 1.0, alpha: int = 255):
+        cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+        rx, ry = max((x2 - x1) / 2.0, 0.5), max((y2 - y1) / 2.0, 0.5)
+
+        def inside(grow: float) -> np.ndarray:
+            return (((self.x - cx) / (rx + grow)) ** 2
+                    + ((self.y - cy) / (ry + grow)) ** 2) <= 1.0
+
+        if outline:
+            self.paint(inside(width / 2.0), outline, alpha)
+            if fill:
+                self.paint(inside(-width / 2.0), fill, alpha)
+        elif fill:
+            self.paint(inside(0.0), fill, alpha)
+
+    def line(self, x1, y1, x2, y2, fill: str, width: float = 1.0):
+        dx, dy = x2 - x1, y2 - y1
+        length2 = dx * dx + dy * dy or 1.0
+        t = np.clip(((self.x - x1) * dx + (self.y - y1) * dy) / length2, 0.0, 1.0)
+        dist2 = (self.x - (x1 + t * dx)) ** 2 + (self.y - (y1 + t * dy)) ** 2
+        r = max(width, 1.0) / 2.0 + 0.1
+        self.paint(dist2 <= r * r, fill)
+
+    def polygon(self, points: List[float], fill: str):
+        xs, ys = points[0::2], points[1::2]
+        inside = np.zeros(self.x.shape, bool)
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            xi, yi, xj, yj = xs[i], ys[i], xs[j], ys[j]
+            if yi != yj:
+                crosses = (yi > self.y) != (yj > self.y)
+                x_at = (xj - xi) * (self.y - yi) / (yj - yi) + xi
+                inside ^= crosses & (self.x < x_at)
+            j = i
+        self.paint(inside, fill)
+
+
+class _Sprite:
+    """
+    A 3x3-cell tile split into per-cell blocks, each pre-classified so the
+    common cases (empty, fully opaque) cost a single NumPy call to blit.
+    """
+
+    def __init__(self, layer: _Layer, cs: int):
+        rgb = np.clip(np.rint(layer.rgb / np.maximum(layer.alpha, 1e-6)[..., None]),
+                      0, 255).astype(np.uint8)
+        alpha = np.rint(layer.alpha * 255).astype(np.uint16)
+        self.blocks: List[List[Optional[tuple]]] = []
+        for by in range(3):
+            row = []
+            for bx in range(3):
+                a = alpha[by * cs:(by + 1) * cs, bx * cs:(bx + 1) * cs]
+                c = rgb[by * cs:(by + 1) * cs, bx * cs:(bx + 1) * cs]
+                if not a.any():
+                    row.append(None)
+                elif (a == 255).all():
+                    row.append(("copy", c.copy()))
+                elif ((a == 0) | (a == 255)).all():
+                    row.append(("mask", c.copy(), (a == 255)[..., None]))
+                else:
+                    a16 = a[..., None]
+                    row.append(("blend", c.astype(np.uint16) * a16, 255 - a16))
+            self.blocks.append(row)
+
+
+def _composite(region: np.ndarray, block: Optional[tuple]):
+    if block is None:
+        return
+    kind = block[0]
+    if kind == "copy":
+        region[...] = block[1]
+    elif kind == "mask":
+        np.copyto(region, block[1], where=block[2])
+    else:
+        region[...] = (region * block[2] + block[1] + 127) // 255
+
+
+# ====================================================================
+#  RENDERER
+# ====================================================================
+class FrameRenderer:
+    """Keeps one RGB framebuffer in sync with a `Game`, redrawing only changed cells."""
+
+    def __init__(self, grid_width: int, grid_height: int, cell_size: int = CELL_SIZE):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.cell_size = cell_size
+        self.background = self._render_grass()
+        self.frame = self.background.copy()
+        self._sprites: Dict[tuple, _Sprite] = {}
+        self._body_keys: Dict[int, List[tuple]] = {}
+        self._cells: Dict[Point, tuple] = {}    # cell -> body sprite key
+        self._overlays: List[Tuple[Point, tuple]] = []  # apple, head (z-order)
+
+    # -- sprites ------------------------------------------------------
+    def _sprite(self, key: tuple) -> _Sprite:
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            cs = self.cell_size
+            layer = _Layer(3 * cs, 3 * cs, cs, cs)
+            if key[0] == "apple":
+                self._raster_apple(layer)
+            elif key[0] == "head":
+                self._raster_head(layer, key[1])
+            else:
+                self._raster_body(layer, key[1], key[2])
+            sprite = self._sprites[key] = _Sprite(layer, cs)
+        return sprite
+
+    def _raster_apple(self, c: _Layer):
+        cs = self.cell_size
+        cx = cy = cs // 2
+        r = cs // 2 - 2
+        c.oval(cx - r + 2, cy - r + 3, cx + r + 2, cy + r + 3, APPLE_SHADOW,
+               alpha=STIPPLE_GRAY25)
+        c.oval(cx - r, cy - r + 1, cx + r, cy + r + 1, APPLE_BODY, APPLE_DARK, 1)
+        hr = r // 3
+        c.oval(cx - r + 3, cy - r + 3, cx - r + 3 + hr * 2, cy - r + 3 + hr * 2,
+               APPLE_HIGHLIGHT)
+        c.line(cx, cy - r + 1, cx + 1, cy - r - 4, APPLE_STEM, 2)
+        c.polygon([cx + 1, cy - r - 2, cx + 7, cy - r - 7, cx + 4, cy - r - 1], APPLE_LEAF)
+
+    def _raster_head(self, c: _Layer, direction: str):
+        # Same geometry as SnakeGUI._draw_snake_head, in cell-local coordinates.
+        cs = self.cell_size
+        cx = cy = cs // 2
+        c.rectangle(1, 1, cs - 1, cs - 1, SNAKE_HEAD, SNAKE_OUTLINE, 2)
+
+        eye_r, pr = 3, 1.5
+        offsets = {
+            "Right": ((5, -4), (5,  4), ( 1, 0)),
+            "Left":  ((-5, -4), (-5,  4), (-1, 0)),
+            "Up":    ((-4, -5), ( 4, -5), ( 0, -1)),
+            "Down":  ((-4,  5), ( 4,  5), ( 0,  1)),
+        }
+        (e1dx, e1dy), (e2dx, e2dy), (pdx, pdy) = offsets.get(direction, offsets["Right"])
+        for edx, edy in [(e1dx, e1dy), (e2dx, e2dy)]:
+            ex, ey = cx + edx, cy + edy
+            c.oval(ex - eye_r, ey - eye_r, ex + eye_r, ey + eye_r, SNAKE_EYE_W)
+            c.oval(ex + pdx - pr, ey + pdy - pr, ex + pdx + pr, ey + pdy + pr, SNAKE_EYE_P)
+
+        hs = cs // 2
+        tongue_map = {
+            "Right": (cx + hs, cy, cx + hs + 7, cy - 2, cx + hs + 7, cy + 2),
+            "Left":  (cx - hs, cy, cx - hs - 7, cy - 2, cx - hs - 7, cy + 2),
+            "Up":    (cx, cy - hs, cx - 2, cy - hs - 7, cx + 2, cy - hs - 7),
+            "Down":  (cx, cy + hs, cx - 2, cy + hs + 7, cx + 2, cy + hs + 7),
+        }
+        pts = tongue_map.get(direction, tongue_map["Right"])
+        c.line(pts[0], pts[1], pts[2], pts[3], SNAKE_TONGUE, 1.5)
+        c.line(pts[0], pts[1], pts[4], pts[5], SNAKE_TONGUE, 1.5)
+
+    def _raster_body(self, c: _Layer, body_clr: str, scale_clr: str):
+        cs = self.cell_size
+        cx = cy = cs // 2
+        c.rectangle(1, 1, cs - 1, cs - 1, body_clr, SNAKE_OUTLINE, 2)
+        ds = 3
+        c.polygon([cx, cy - ds, cx + ds, cy, cx, cy + ds, cx - ds, cy], scale_clr)
+
+    def _render_grass(self) -> np.ndarray:
+        """Same layout as SnakeGUI._draw_grass (same seed, same draw order)."""
+        import random
+
+        cs = self.cell_size
+        cw, ch = self.grid_width * cs, self.grid_height * cs
+        frame = np.empty((ch, cw, 3), np.uint8)
+        checker = [np.array(_rgb(c), np.uint8) for c in GRASS_CHECKER]
+        for gx in range(self.grid_width):
+            for gy in range(self.grid_height):
+                frame[gy * cs:(gy + 1) * cs, gx * cs:(gx + 1) * cs] = checker[(gx + gy) % 2]
+
+        rng = random.Random(GRASS_SEED)
+        for _ in range(GRASS_BLADES):
+            bx = rng.randint(0, cw - 1)
+            by = rng.randint(0, ch - 1)
+            bl = rng.randint(3, 8)
+            dx = rng.choice([-2, -1, 0, 1, 2])
+            color = _rgb(rng.choice(GRASS_COLORS))
+            for i in range(bl + 1):
+                px = int(round(bx + dx * i / bl))
+                py = by - i
+                if 0 <= px < cw and 0 <= py < ch:
+                    frame[py, px] = color
+
+        for _ in range(GRASS_DOTS):
+            fx = rng.randint(4, cw - 4)
+            fy = rng.randint(4, ch - 4)
+            fs = rng.choice([1, 2])
+            color = _rgb(rng.choice(GRASS_FLOWER))
+            ys, xs = np.mgrid[-fs:fs, -fs:fs]
+            mask = (xs + 0.5) ** 2 + (ys + 0.5) ** 2 <= fs * fs
+            frame[fy - fs:fy + fs, fx - fs:fx + fs][mask] = color
+        return frame
+
+    # -- frames -------------------------------------------------------
+    def _body_sprite_keys(self, total: int) -> List[tuple]:
+        keys = self._body_keys.get(total)
+        if keys is None:
+            keys = [("body",) + body_colors(i, total) for i in range(total)]
+            self._body_keys[total] = keys
+        return keys
+
+    def _redraw_cell(self, x: int, y: int):
+        cs = self.cell_size
+        region = self.frame[y * cs:(y + 1) * cs, x * cs:(x + 1) * cs]
+        region[...] = self.background[y * cs:(y + 1) * cs, x * cs:(x + 1) * cs]
+        for (px, py), key in self._overlays:
+            dx, dy = x - px, y - py
+            if -1 <= dx <= 1 and -1 <= dy <= 1:
+                _composite(region, self._sprite(key).blocks[dy + 1][dx + 1])
+        key = self._cells.get((x, y))
+        if key is not None:
+            _composite(region, self._sprite(key).blocks[1][1])
+
+    def render(self, game: Game) -> np.ndarray:
+        """Update and return the framebuffer (H x W x 3, uint8) for `game`."""
+        w, h = self.grid_width, self.grid_height
+        cells: Dict[Point, tuple] = {}
+        overlays: List[Tuple[Point, tuple]] = []
+
+        food = game.get_food_position()
+        if food is not None:
+            overlays.append((food, ("apple",)))
+        body = game.snake.body
+        if body:
+            overlays.append((body[0], ("head", game.snake.direction)))
+            keys = self._body_sprite_keys(len(body))
+            for i in range(1, len(body)):
+                cells[body[i]] = keys[i]
+
+        prev = self._cells
+        dirty = {p for p, k in cells.items() if prev.get(p) != k}
+        dirty.update(p for p in prev if p not in cells)
+        if overlays != self._overlays:
+            for (px, py), _ in overlays + self._overlays:
+                for dy in (-1, 0, 1):
+                    for dx in (-1, 0, 1):
+                        dirty.add((px + dx, py + dy))
+
+        self._cells = cells
+        self._overlays = overlays
+        for x, y in dirty:
+            if 0 <= x < w and 0 <= y < h:
+                self._redraw_cell(x, y)
+        return self.frame
+
+
+# ====================================================================
+#  OUTPUT
+# ====================================================================
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return (struct.pack(">I", len(data)) + tag + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def _png_from_raw(raw: np.ndarray, w: int, h: int, compress_level: int) -> bytes:
+    """PNG bytes from filtered scanlines (a filter byte, then w*3 bytes, per row)."""
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+            + _png_chunk(b"IDAT", zlib.compress(raw, compress_level))
+            + _png_chunk(b"IEND", b""))
+
+
+def encode_png(frame: np.ndarray, compress_level: int = 1) -> bytes:
+    """Encode an RGB uint8 frame as PNG using only zlib."""
+    h, w, _ = frame.shape
+    raw = np.zeros((h, w * 3 + 1), np.uint8)  # filter byte 0 per row
+    raw[:, 1:] = frame.reshape(h, w * 3)
+    return _png_from_raw(raw, w, h, compress_level)
+
+
+class PngSequenceWriter:
+    """
+    Writes frames as DIRECTORY/PREFIX_000000.png, PREFIX_000001.png, ...
+
+    `write` only copies the frame into a free scanline buffer; compression
+    and file writes run on worker threads (zlib releases the GIL), with at
+    most `max_pending` frames in flight.
+    """
+
+    def __init__(self, directory: str, prefix: str = "frame", compress_level: int = 1,
+                 workers: Optional[int] = None, max_pending: int = 32):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.compress_level = compress_level
+        self.count = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 2)
+        self._pending: Deque[Tuple[Future, np.ndarray]] = deque()
+        self._free: List[np.ndarray] = []
+        self.max_pending = max_pending
+
+    def _buffer(self, h: int, w: int) -> np.ndarray:
+        if len(self._pending) >= self.max_pending:
+            fut, raw = self._pending.popleft()
+            fut.result()
+            self._free.append(raw)
+        while self._free:
+            raw = self._free.pop()
+            if raw.shape == (h, w * 3 + 1):
+                return raw
+        return np.zeros((h, w * 3 + 1), np.uint8)  # filter byte 0 per row
+
+    def _save(self, path: str, raw: np.ndarray, w: int, h: int):
+        data = _png_from_raw(raw, w, h, self.compress_level)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def write(self, frame: np.ndarray):
+        h, w, _ = frame.shape
+        raw = self._buffer(h, w)
+        raw[:, 1:] = frame.reshape(h, w * 3)
+        path = os.path.join(self.directory, f"{self.prefix}_{self.count:06d}.png")
+        self._pending.append((self._pool.submit(self._save, path, raw, w, h), raw))
+        self.count += 1
+
+    def close(self):
+        """Wait for every queued frame to reach disk."""
+        while self._pending:
+            fut, raw = self._pending.popleft()
+            fut.result()
+            self._free.append(raw)
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GifWriter:
+    """
+    Streams an animated GIF to `path` as frames arrive (needs Pillow).
+
+    The palette is taken from the first frame and shared by the clip. Each
+    later frame is written as the sub-rectangle that changed since the
+    previous one, so memory stays flat and an ordinary tick, which touches
+    a few cells, costs a small crop rather than a full-frame quantize.
+    """
+
+    def __init__(self, path: str, fps: float = 10.0, scale: int = 1):
+        try:
+            from PIL import Image, GifImagePlugin
+        except ImportError:
+            raise RuntimeError("GIF export needs Pillow (pip install pillow)") from None
+        self._image = Image
+        self._gif = GifImagePlugin
+        self.path = path
+        self.duration = int(round(1000.0 / fps))
+        self.scale = scale
+        self.count = 0
+        self._file = open(path, "wb")
+        self._palette = None
+        self._prev: Optional[np.ndarray] = None
+
+    def _frame(self, pixels: np.ndarray, offset: Tuple[int, int]):
+        img = self._image.fromarray(np.ascontiguousarray(pixels), "RGB")
+        img = img.quantize(palette=self._palette, dither=self._image.Dither.NONE)
+        for data in self._gif.getdata(img, offset, duration=self.duration, disposal=1):
+            self._file.write(data)
+
+    def write(self, frame: np.ndarray):
+        if self.scale > 1:
+            frame = frame[::self.scale, ::self.scale]
+        self.count += 1
+        if self._prev is None:
+            # One palette for the whole clip: steadier colours, cheaper quantize.
+            first = self._image.fromarray(np.ascontiguousarray(frame), "RGB")
+            self._palette = first.quantize(colors=255)
+            header, _ = self._gif.getheader(self._palette, info={"loop": 0})
+            for data in header:
+                self._file.write(data)
+            self._frame(frame, (0, 0))
+            self._prev = frame.copy()
+            return
+
+        h, w, _ = frame.shape
+        # Compare as (h, w*3) bytes: reducing along contiguous rows is fast.
+        changed = frame.reshape(h, w * 3) != self._prev.reshape(h, w * 3)
+        rows = np.flatnonzero(changed.any(axis=1))
+        if not len(rows):
+            # Nothing moved: a 1x1 frame keeps the timing.
+            self._frame(frame[:1, :1], (0, 0))
+            return
+        y0, y1 = rows[0], rows[-1] + 1
+        cols = np.flatnonzero(changed[y0:y1].any(axis=0))
+        x0, x1 = cols[0] // 3, cols[-1] // 3 + 1
+        self._frame(frame[y0:y1, x0:x1], (int(x0), int(y0)))
+        self._prev[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+
+    def close(self):
+        if not self._file.closed:
+            if self._prev is not None:
+                self._file.write(b";")  # trailer
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
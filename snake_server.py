@@ -0,0 +1,405 @@
+# snake_server.py
+"""
+Authoritative asyncio game server, headless client and load generator.
+
+Wire format (all big-endian):
+
+  client -> server   fixed 3-byte messages: op (u8), arg (u16)
+                       OP_JOIN  arg = match id
+                       OP_DIR   arg = direction code (index into Snake.DIRECTION_NAMES)
+
+  server -> client   frames prefixed with their length (u16)
+                       MSG_FULL   complete state, sent on join and after a reset
+                       MSG_DELTA  per-tick change: head added, tail removed,
+                                  food moved, game over
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import struct
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+from snake_logic import Game, Point, Snake
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_TICK_MS = 130
+DEFAULT_WIDTH = 30
+DEFAULT_HEIGHT = 20
+
+OP_JOIN = 1
+OP_DIR = 2
+CLIENT_MSG = struct.Struct("!BH")
+
+MSG_FULL = 1
+MSG_DELTA = 2
+FRAME_LEN = struct.Struct("!H")
+FULL_HEADER = struct.Struct("!BIHHIBhhH")   # type, tick, w, h, score, dir, food x/y, n
+DELTA = struct.Struct("!BIBhhhhI")          # type, tick, flags, head x/y, food x/y, score
+
+HEAD_ADDED = 0x01
+TAIL_REMOVED = 0x02
+FOOD_MOVED = 0x04
+GAME_OVER = 0x08
+
+MAX_BACKLOG = 64 * 1024  # bytes queued for a client before it is dropped
+
+# A full frame carries every body cell as two u16s behind a u16 length, and
+# deltas carry coordinates as i16, so the grid has to fit both.
+MAX_CELLS = (0xFFFF - FULL_HEADER.size) // 4
+MAX_SIDE = 0x7FFF
+
+
+def _frame(payload: bytes) -> bytes:
+    return FRAME_LEN.pack(len(payload)) + payload
+
+
+# ====================================================================
+#  SERVER
+# ====================================================================
+class Match:
+    """One `Game` plus the clients connected to it."""
+
+    def __init__(self, match_id: int, grid_width: int, grid_height: int):
+        self.match_id = match_id
+        self.game = Game(grid_width, grid_height, start_length=4)
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self.tick = 0
+        self.needs_reset = False
+
+    def full_frame(self) -> bytes:
+        g = self.game
+        food = g.get_food_position() or (-1, -1)
+        body = g.snake.body
+        payload = FULL_HEADER.pack(
+            MSG_FULL, self.tick, g.grid_width, g.grid_height, g.score,
+            Snake.DIRECTION_CODES[g.snake.direction], food[0], food[1], len(body))
+        flat = [c for p in body for c in p]
+        return _frame(payload + struct.pack(f"!{len(flat)}H", *flat))
+
+    def advance(self) -> bytes:
+        """Step the game one tick and return the frame to broadcast."""
+        self.tick += 1
+        if self.needs_reset:
+            self.needs_reset = False
+            self.game.reset()
+            return self.full_frame()
+
+        g = self.game
+        food_before = g.get_food_position()
+        result = g.step()
+
+        flags = 0
+        if result["alive"]:
+            flags |= HEAD_ADDED
+            if not result["ate"]:
+                flags |= TAIL_REMOVED
+        if result["game_over"]:
+            flags |= GAME_OVER
+            self.needs_reset = True
+        food = g.get_food_position()
+        if food != food_before:
+            flags |= FOOD_MOVED
+        head = g.snake.body[0]
+        food = food or (-1, -1)
+        return _frame(DELTA.pack(MSG_DELTA, self.tick, flags,
+                                 head[0], head[1], food[0], food[1], g.score))
+
+
+class GameServer:
+    def __init__(self, grid_width: int = DEFAULT_WIDTH,
+                 grid_height: int = DEFAULT_HEIGHT,
+                 tick_ms: int = DEFAULT_TICK_MS):
+        if not (0 < grid_width <= MAX_SIDE and 0 < grid_height <= MAX_SIDE
+                and grid_width * grid_height <= MAX_CELLS):
+            raise ValueError(f"grid {grid_width}x{grid_height} does not fit the wire "
+                             f"format (at most {MAX_CELLS} cells, {MAX_SIDE} per side)")
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.tick_ms = tick_ms
+        self.matches: Dict[int, Match] = {}
+        self.tick_times: Deque[float] = deque(maxlen=1000)  # seconds per tick
+        self.tick_lateness: Deque[float] = deque(maxlen=1000)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def get_match(self, match_id: int) -> Match:
+        match = self.matches.get(match_id)
+        if match is None:
+            match = Match(match_id, self.grid_width, self.grid_height)
+            self.matches[match_id] = match
+        return match
+
+    async def _handle_client(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter):
+        match: Optional[Match] = None
+        try:
+            while True:
+                op, arg = CLIENT_MSG.unpack(await reader.readexactly(CLIENT_MSG.size))
+                if op == OP_JOIN:
+                    if match is not None:
+                        match.clients.discard(writer)
+                    match = self.get_match(arg)
+                    match.clients.add(writer)
+                    writer.write(match.full_frame())
+                elif op == OP_DIR and match is not None and arg < len(Snake.DIRECTION_NAMES):
+                    match.game.queue_input(Snake.DIRECTION_NAMES[arg])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if match is not None:
+                match.clients.discard(writer)
+            writer.close()
+
+    def tick(self):
+        """Advance every match and broadcast its frame."""
+        for match in list(self.matches.values()):
+            if not match.clients:
+                continue
+            frame = match.advance()
+            for writer in list(match.clients):
+                if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                    # Slow consumer: drop it rather than stall the tick.
+                    match.clients.discard(writer)
+                    writer.close()
+                    continue
+                writer.write(frame)
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        interval = self.tick_ms / 1000.0
+        deadline = loop.time() + interval
+        while True:
+            await asyncio.sleep(max(deadline - loop.time(), 0))
+            started = loop.time()
+            self.tick_lateness.append(started - deadline)
+            self.tick()
+            self.tick_times.append(loop.time() - started)
+            deadline += interval
+            if deadline < loop.time():
+                # Fell behind by more than a whole tick: skip ahead, don't burst.
+                deadline = loop.time() + interval
+
+    async def _report_loop(self, every: float):
+        while True:
+            await asyncio.sleep(every)
+            print(self.format_stats(), flush=True)
+
+    def format_stats(self) -> str:
+        clients = sum(len(m.clients) for m in self.matches.values())
+        if not self.tick_times:
+            return f"matches={len(self.matches)} clients={clients}"
+        times = sorted(self.tick_times)
+        late = sorted(self.tick_lateness)
+        p99 = times[min(int(len(times) * 0.99), len(times) - 1)]
+        return (f"matches={len(self.matches)} clients={clients} "
+                f"tick p50={statistics.median(times) * 1000:.2f}ms "
+                f"p99={p99 * 1000:.2f}ms max={times[-1] * 1000:.2f}ms "
+                f"late p50={statistics.median(late) * 1000:.2f}ms")
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    report_every: float = 0.0):
+        self._server = await asyncio.start_server(self._handle_client, host, port,
+                                                  backlog=4096)
+        tasks = [asyncio.ensure_future(self._tick_loop())]
+        if report_every > 0:
+            tasks.append(asyncio.ensure_future(self._report_loop(report_every)))
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+# ====================================================================
+#  HEADLESS CLIENT
+# ====================================================================
+class GameClient:
+    """Keeps a mirror of one match's state by applying the server's frames."""
+
+    def __init__(self):
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.body: Deque[Point] = deque()
+        self.food: Optional[Point] = None
+        self.score = 0
+        self.direction = "Right"
+        self.tick = 0
+        self.grid_width = 0
+        self.grid_height = 0
+        self.game_over = False
+        self.frames = 0
+
+    async def connect(self, host: str, port: int, match_id: int = 0):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(CLIENT_MSG.pack(OP_JOIN, match_id))
+
+    def send_direction(self, direction: str):
+        self.writer.write(CLIENT_MSG.pack(OP_DIR, Snake.DIRECTION_CODES[direction]))
+
+    async def read_frame(self) -> int:
+        """Read and apply one frame. Returns its message type."""
+        (length,) = FRAME_LEN.unpack(await self.reader.readexactly(FRAME_LEN.size))
+        payload = await self.reader.readexactly(length)
+        self.frames += 1
+        if payload[0] == MSG_FULL:
+            self._apply_full(payload)
+        else:
+            self._apply_delta(payload)
+        return payload[0]
+
+    def _apply_full(self, payload: bytes):
+        (_, self.tick, self.grid_width, self.grid_height, self.score,
+         d, fx, fy, n) = FULL_HEADER.unpack_from(payload)
+        flat = struct.unpack_from(f"!{2 * n}H", payload, FULL_HEADER.size)
+        self.body = deque(zip(flat[0::2], flat[1::2]))
+        self.direction = Snake.DIRECTION_NAMES[d]
+        self.food = None if fx < 0 else (fx, fy)
+        self.game_over = False
+
+    def _apply_delta(self, payload: bytes):
+        _, self.tick, flags, hx, hy, fx, fy, self.score = DELTA.unpack(payload)
+        if flags & HEAD_ADDED:
+            if self.body:
+                px, py = self.body[0]
+                for name, (dx, dy) in Snake.DIRECTIONS.items():
+                    if (px + dx, py + dy) == (hx, hy):
+                        self.direction = name
+                        break
+            self.body.appendleft((hx, hy))
+        if flags & TAIL_REMOVED:
+            self.body.pop()
+        if flags & FOOD_MOVED:
+            self.food = None if fx < 0 else (fx, fy)
+        self.game_over = bool(flags & GAME_OVER)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def run_client(host: str, port: int, match_id: int, turn_chance: float):
+    client = GameClient()
+    await client.connect(host, port, match_id)
+    rng = random.Random()
+    try:
+        while True:
+            await client.read_frame()
+            if client.game_over:
+                print(f"tick {client.tick}: game over, score {client.score}", flush=True)
+            elif rng.random() < turn_chance:
+                client.send_direction(rng.choice(Snake.DIRECTION_NAMES))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        print("disconnected")
+    finally:
+        client.close()
+
+
+# ====================================================================
+#  LOAD GENERATOR
+# ====================================================================
+async def _load_worker(host: str, port: int, match_id: int, turn_chance: float,
+                       stop_at: float, gaps: List[float], counts: List[int]):
+    client = GameClient()
+    try:
+        await client.connect(host, port, match_id)
+    except OSError:
+        counts[1] += 1
+        return
+    counts[0] += 1
+    rng = random.Random(match_id)
+    loop = asyncio.get_running_loop()
+    last = None
+    try:
+        while loop.time() < stop_at:
+            try:
+                await asyncio.wait_for(client.read_frame(), stop_at - loop.time())
+            except asyncio.TimeoutError:
+                break
+            now = loop.time()
+            if last is not None:
+                gaps.append(now - last)
+            last = now
+            if rng.random() < turn_chance:
+                client.send_direction(rng.choice(Snake.DIRECTION_NAMES))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        counts[2] += 1
+    finally:
+        client.close()
+
+
+async def run_load(host: str, port: int, clients: int, matches: int,
+                   duration: float, turn_chance: float = 0.1,
+                   tick_ms: int = DEFAULT_TICK_MS):
+    """Open `clients` connections spread over `matches` and report frame gaps."""
+    loop = asyncio.get_running_loop()
+    gaps: List[float] = []
+    counts = [0, 0, 0]  # connected, failed, dropped
+    stop_at = loop.time() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _load_worker(host, port, i % matches, turn_chance, stop_at, gaps, counts)
+        for i in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    print(f"clients: {counts[0]} connected, {counts[1]} failed, {counts[2]} dropped")
+    print(f"frames: {len(gaps) + counts[0]} in {elapsed:.1f}s "
+          f"({(len(gaps) + counts[0]) / elapsed:.0f}/s)")
+    if gaps:
+        gaps.sort()
+        ms = [g * 1000 for g in gaps]
+        print(f"frame gap (target {tick_ms}ms): p50={ms[len(ms) // 2]:.1f}ms "
+              f"p99={ms[min(int(len(ms) * 0.99), len(ms) - 1)]:.1f}ms max={ms[-1]:.1f}ms")
+
+
+# ====================================================================
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Snake game server tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="run the authoritative game server")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    p.add_argument("--height", type=int, default=DEFAULT_HEIGHT)
+    p.add_argument("--tick-ms", type=int, default=DEFAULT_TICK_MS)
+    p.add_argument("--report", type=float, default=5.0,
+                   help="seconds between tick-latency reports (0 disables)")
+
+    p = sub.add_parser("client", help="connect a headless client")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--match", type=int, default=0)
+    p.add_argument("--turn-chance", type=float, default=0.1)
+
+    p = sub.add_parser("load", help="simulate many clients against a server")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--clients", type=int, default=1000)
+    p.add_argument("--matches", type=int, default=100)
+    p.add_argument("--duration", type=float, default=10.0)
+    p.add_argument("--turn-chance", type=float, default=0.1)
+    p.add_argument("--tick-ms", type=int, default=DEFAULT_TICK_MS)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "serve":
+            try:
+                server = GameServer(args.width, args.height, args.tick_ms)
+            except ValueError as e:
+                parser.error(str(e))
+            asyncio.run(server.serve(args.host, args.port, args.report))
+        elif args.command == "client":
+            asyncio.run(run_client(args.host, args.port, args.match, args.turn_chance))
+        else:
+            asyncio.run(run_load(args.host, args.port, args.clients, args.matches,
+                                 args.duration, args.turn_chance, args.tick_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
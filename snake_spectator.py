@@ -0,0 +1,219 @@
+# snake_spectator.py
+"""
+Spectator wall: many bot-driven games shown at once in one Tk window.
+
+Each board is a single PhotoImage on a shared canvas, with one pixel
+block per cell. Boards follow their game's events to collect the cells
+that changed, and a refresh only `put`s those cells, so a board costs a
+handful of Tk calls per step instead of one canvas item per segment.
+Refreshes are spread over frames against a time budget: when the wall
+cannot repaint every board within a frame, each board is simply
+refreshed less often (its changes coalesce) and the frame rate holds.
+"""
+import math
+import time
+import tkinter as tk
+from typing import Callable, Dict, List, Optional, Tuple
+
+from snake_logic import (
+    Game, EVENT_MOVED, EVENT_ATE, EVENT_SCORE_CHANGED, EVENT_DIED, EVENT_WON,
+)
+from snake_theme import GRASS_CHECKER, SNAKE_HEAD, SNAKE_BODY_END, SNAKE_TONGUE, APPLE_BODY
+
+Point = Tuple[int, int]
+
+BG_COLOR = "#1a1a2e"
+TEXT_COLOR = "#e0e0e0"
+SCORE_CLR = "#00d4aa"
+LABEL_HEIGHT = 14
+GAP = 6
+RESTART_DELAY = 1.0  # seconds a finished board stays up before restarting
+RENDER_SHARE = 0.6   # fraction of each frame spent repainting boards
+
+
+class Board:
+    """One game plus the cells that changed since it was last painted."""
+
+    def __init__(self, game: Game, bot: Callable):
+        self.game = game
+        self.bot = bot
+        self.dirty: Dict[Point, str] = {}
+        self.score_dirty = True
+        self.ended_at: Optional[float] = None
+        self.games = 0
+        self.best = 0
+        self._head: Optional[Point] = None
+        game.subscribe(EVENT_MOVED, self._on_moved)
+        game.subscribe(EVENT_ATE, self._on_ate)
+        game.subscribe(EVENT_SCORE_CHANGED, self._on_score_changed)
+        game.subscribe(EVENT_DIED, self._on_end)
+        game.subscribe(EVENT_WON, self._on_end)
+        self.restart()
+
+    @staticmethod
+    def grass(cell: Point) -> str:
+        return GRASS_CHECKER[(cell[0] + cell[1]) % 2]
+
+    def restart(self):
+        """Reset the game; the caller repaints the background."""
+        game = self.game
+        game.reset()
+        self.ended_at = None
+        self.games += 1
+        self.dirty = {cell: SNAKE_BODY_END for cell in game.snake.body}
+        self._head = game.snake.body[0]
+        self.dirty[self._head] = SNAKE_HEAD
+        if game.food is not None:
+            self.dirty[game.food] = APPLE_BODY
+        self.score_dirty = True
+
+    def step(self, now: float):
+        if self.ended_at is None:
+            self.game.step(self.bot(self.game))
+            if not self.game.running:
+                self.ended_at = now
+
+    # -- event handlers ------------------------------------------------
+    def _on_moved(self, event):
+        if event.tail is not None:
+            self.dirty[event.tail] = self.grass(event.tail)
+        self.dirty[self._head] = SNAKE_BODY_END
+        self.dirty[event.head] = SNAKE_HEAD
+        self._head = event.head
+
+    def _on_ate(self, event):
+        if event.next_food is not None:
+            self.dirty[event.next_food] = APPLE_BODY
+
+    def _on_score_changed(self, event):
+        self.best = max(self.best, event.new)
+        self.score_dirty = True
+
+    def _on_end(self, event):
+        self.dirty[self._head] = SNAKE_TONGUE
+
+
+class SpectatorWall:
+    def __init__(self, root: tk.Tk, boards: List[Board], cell_px: int = 6,
+                 fps: float = 30.0, step_ms: int = 130):
+        self.root = root
+        self.boards = boards
+        self.cell_px = cell_px
+        self.frame_time = 1.0 / fps
+        self.step_time = step_ms / 1000.0
+        game = boards[0].game
+        self.board_w = game.grid_width * cell_px
+        self.board_h = game.grid_height * cell_px
+
+        self.cols = math.ceil(math.sqrt(len(boards)))
+        rows = math.ceil(len(boards) / self.cols)
+        slot_w = self.board_w + GAP
+        slot_h = self.board_h + LABEL_HEIGHT + GAP
+        self.root.title(f"\U0001f40d Snake - {len(boards)} boards")
+        self.root.configure(bg=BG_COLOR)
+        self.canvas = tk.Canvas(root, width=self.cols * slot_w + GAP,
+                                height=rows * slot_h + GAP + LABEL_HEIGHT,
+                                bg=BG_COLOR, highlightthickness=0)
+        self.canvas.pack()
+
+        # Grass drawn once; boards copy it in when their game restarts.
+        self.background = tk.PhotoImage(width=self.board_w, height=self.board_h)
+        rows_data = []
+        for gy in range(game.grid_height):
+            row = " ".join(self._grass_row(gy, game.grid_width))
+            rows_data.extend(["{" + row + "}"] * cell_px)
+        self.background.put(" ".join(rows_data))
+
+        self.images: List[tk.PhotoImage] = []
+        self.labels: List[int] = []
+        for i, board in enumerate(boards):
+            x = GAP + (i % self.cols) * slot_w
+            y = GAP + (i // self.cols) * slot_h
+            image = tk.PhotoImage(width=self.board_w, height=self.board_h)
+            self._blit_background(image)
+            self.images.append(image)
+            self.canvas.create_image(x, y + LABEL_HEIGHT, image=image, anchor="nw")
+            self.labels.append(self.canvas.create_text(
+                x, y, anchor="nw", text="", fill=TEXT_COLOR, font=("Consolas", 8)))
+        self.status = self.canvas.create_text(
+            GAP, rows * slot_h + GAP, anchor="nw", text="",
+            fill=SCORE_CLR, font=("Consolas", 9))
+
+        self._cursor = 0  # next board to repaint
+        self._next_step = time.perf_counter()
+        self._frames = 0
+        self._repaints = 0
+        self._window_start = time.perf_counter()
+        self._tick()
+
+    def _grass_row(self, gy: int, width: int):
+        for gx in range(width):
+            yield from [Board.grass((gx, gy))] * self.cell_px
+
+    def _blit_background(self, image: tk.PhotoImage):
+        image.tk.call(image, "copy", self.background)
+
+    # ----------------------------------------------------------------
+    #  FRAME LOOP
+    # ----------------------------------------------------------------
+    def _tick(self):
+        started = time.perf_counter()
+
+        # Advance the simulations; catch up if a frame ran long, but cap
+        # the backlog so a stall does not fast-forward every game.
+        steps = 0
+        while self._next_step <= started and steps < 5:
+            for board in self.boards:
+                board.step(started)
+            self._next_step += self.step_time
+            steps += 1
+        if self._next_step <= started:
+            self._next_step = started + self.step_time
+        for i, board in enumerate(self.boards):
+            if board.ended_at is not None and started - board.ended_at >= RESTART_DELAY:
+                self._blit_background(self.images[i])
+                board.restart()
+
+        # Repaint boards round-robin until this frame's budget is spent.
+        deadline = started + self.frame_time * RENDER_SHARE
+        n = len(self.boards)
+        for _ in range(n):
+            i = self._cursor
+            self._cursor = (i + 1) % n
+            self._paint(i)
+            if time.perf_counter() >= deadline:
+                break
+
+        self._frames += 1
+        now = time.perf_counter()
+        if now - self._window_start >= 1.0:
+            self._update_status(now)
+        delay = self.frame_time - (now - started)
+        self.root.after(max(1, int(delay * 1000)), self._tick)
+
+    def _paint(self, i: int):
+        board = self.boards[i]
+        if board.dirty:
+            image = self.images[i]
+            c = self.cell_px
+            for (gx, gy), color in board.dirty.items():
+                image.put(color, to=(gx * c, gy * c, gx * c + c, gy * c + c))
+            board.dirty.clear()
+            self._repaints += 1
+        if board.score_dirty:
+            self.canvas.itemconfig(
+                self.labels[i],
+                text=f"#{i + 1}  {board.game.score}  best {board.best}")
+            board.score_dirty = False
+
+    def _update_status(self, now: float):
+        elapsed = now - self._window_start
+        fps = self._frames / elapsed
+        per_board = self._repaints / elapsed / len(self.boards)
+        self.canvas.itemconfig(
+            self.status,
+            text=f"{fps:.0f} fps   {per_board:.1f} repaints/s per board   "
+                 f"games played {sum(b.games for b in self.boards)}")
+        self._frames = 0
+        self._repaints = 0
+        self._window_start = now
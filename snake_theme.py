@@ -0,0 +1,47 @@
+# snake_theme.py
+"""Board visuals shared by the Tk GUI and the offscreen renderer."""
+
+CELL_SIZE = 24
+
+# ---- Grass palette ------------------------------------------------
+GRASS_BASE    = "#2d5a27"
+GRASS_CHECKER = ("#2a5e2a", "#276227")
+GRASS_COLORS  = ["#1e4d2b", "#2d6a2e", "#3a7a3a", "#245522",
+                 "#1b4d1b", "#336633"]
+GRASS_FLOWER  = ["#dec04a", "#c776d5", "#bcd298"]
+GRASS_SEED    = 42   # blade / flower layout is the same every game
+GRASS_BLADES  = 350
+GRASS_DOTS    = 35
+
+# ---- Snake palette ------------------------------------------------
+SNAKE_HEAD       = "#7836e2"
+SNAKE_BODY_START = "#7836e2"
+SNAKE_BODY_END   = "#492386"
+SNAKE_OUTLINE    = "#000000"
+SNAKE_EYE_W      = "#ffffff"
+SNAKE_EYE_P      = "#1a1a1a"
+SNAKE_TONGUE     = "#ef4444"
+
+# ---- Apple palette ------------------------------------------------
+APPLE_SHADOW    = "#1a1a1a"
+APPLE_BODY      = "#ef4444"
+APPLE_DARK      = "#dc2626"
+APPLE_HIGHLIGHT = "#fca5a5"
+APPLE_STEM      = "#78350f"
+APPLE_LEAF      = "#22c55e"
+
+
+def lerp_color(hex1: str, hex2: str, t: float) -> str:
+    r1, g1, b1 = int(hex1[1:3], 16), int(hex1[3:5], 16), int(hex1[5:7], 16)
+    r2, g2, b2 = int(hex2[1:3], 16), int(hex2[3:5], 16), int(hex2[5:7], 16)
+    r = int(r1 + (r2 - r1) * t)
+    g = int(g1 + (g2 - g1) * t)
+    b = int(b1 + (b2 - b1) * t)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def body_colors(i: int, total: int):
+    """Fill and scale colours of body segment `i` in a snake of `total` cells."""
+    t = i / max(total - 1, 1)
+    return (lerp_color(SNAKE_BODY_START, SNAKE_BODY_END, t),
+            lerp_color(SNAKE_BODY_START, SNAKE_BODY_END, max(t - 0.15, 0)))
@@ -0,0 +1,74 @@
+# test_ai.py
+import random
+import time
+
+from snake_ai import MCTSPlayer, ZobristTable, safe_directions
+from snake_logic import Game, Snake
+
+
+def test_incremental_hash_matches_full_rehash():
+    ate = tail_chases = turns = 0
+    for seed in range(40):
+        rng = random.Random(seed)
+        width, height = rng.choice([(4, 3), (5, 4), (6, 5)])
+        game = Game(width, height, start_length=2, seed=seed)
+        z = ZobristTable(width, height, seed=seed)
+        h = z.hash_game(game)
+        for _ in range(300):
+            if not game.is_running():
+                game.reset()
+                h = z.hash_game(game)
+            safe = safe_directions(game)
+            move = rng.choice(safe) if safe and rng.random() < 0.9 else rng.choice(
+                Snake.DIRECTION_NAMES + (None,))
+            tail = game.snake.body[-1]
+            heading = game.snake.direction
+            h, result = z.step(game, h, move)
+            if not result["alive"]:
+                continue
+            assert h == z.hash_game(game)
+            ate += result["ate"]
+            tail_chases += not result["ate"] and game.snake.body[0] == tail
+            turns += game.snake.direction != heading
+    # The walk really exercised each incremental case.
+    assert ate > 50 and tail_chases > 5 and turns > 100
+
+
+def test_hash_covers_direction_and_food():
+    game = Game(8, 6, seed=3)
+    z = ZobristTable(8, 6)
+    h = z.hash_game(game)
+    game.snake.direction = "Up"
+    assert z.hash_game(game) != h
+    game.snake.direction = "Right"
+    game.food = (0, 0) if game.food != (0, 0) else (1, 0)
+    assert z.hash_game(game) != h
+
+
+def test_choose_leaves_the_game_untouched_and_keeps_its_budget():
+    game = Game(10, 8, seed=5)
+    for _ in range(6):
+        game.step()
+    game.queue_input("Up", timestamp=1.0)
+    player = MCTSPlayer(budget_ms=20.0, seed=1)
+    for _ in range(5):
+        before = game.snapshot()
+        rng_state = game.rng_state
+        started = time.perf_counter()
+        move = player.choose(game)
+        elapsed = time.perf_counter() - started
+        assert game.snapshot() == before
+        assert game.rng_state == rng_state
+        assert len(game.inputs) == 1
+        assert move in safe_directions(game)
+        assert elapsed < 0.020 + 0.015  # budget plus scheduling slack
+    assert player.rollouts > 0
+
+
+def test_choose_without_a_choice_returns_at_once():
+    game = Game(4, 1, start_length=3, seed=0)  # a corridor: only Right is open
+    player = MCTSPlayer(budget_ms=1000.0)
+    started = time.perf_counter()
+    assert player.choose(game) == "Right"
+    assert time.perf_counter() - started < 0.1
+    assert player.last_rollouts == 0
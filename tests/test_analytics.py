@@ -0,0 +1,113 @@
+# test_analytics.py
+import os
+import random
+
+from analytics import (
+    LOG_HEADER, RECORD, GameRecord, GameRecorder, QuantileSketch, StatsStore,
+)
+from snake_logic import Game
+
+
+def record(i: int, cause: str = "self") -> GameRecord:
+    return GameRecord(1.7e9 + i, f"p{i % 3}", 10 * i, 50 + i, 1000 + i, i, cause)
+
+
+def test_quantile_sketch_is_within_relative_accuracy():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(20000)] + [0] * 100
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for v in values:
+        sketch.add(v)
+    values.sort()
+    for q in (0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 0.999, 1.0):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-9, q
+
+
+def test_quantile_sketch_round_trips_through_dict():
+    sketch = QuantileSketch()
+    for v in (0, 1, 5, 5, 80, 1234):
+        sketch.add(v)
+    copy = QuantileSketch.from_dict(sketch.to_dict())
+    assert [copy.quantile(q) for q in (0, 0.5, 1)] == [sketch.quantile(q) for q in (0, 0.5, 1)]
+
+
+def test_catch_up_folds_only_new_records(tmp_path):
+    writer = StatsStore(str(tmp_path))
+    reader = StatsStore(str(tmp_path))
+    for i in range(5):
+        writer.append(record(i))
+    assert reader.catch_up() == 5
+    assert reader.catch_up() == 0
+    writer.append(record(5, "wall"))
+    assert reader.catch_up() == 1
+    assert reader.stats.games == writer.stats.games == 6
+    assert reader.stats.causes == {"self": 5, "wall": 1}
+
+    # Reopening resumes from the saved offset instead of rescanning.
+    reopened = StatsStore(str(tmp_path))
+    assert reopened.offset == os.path.getsize(writer.log_path)
+    assert reopened.stats.to_dict() == writer.stats.to_dict()
+
+
+def test_torn_tail_waits_for_the_rest_of_the_record(tmp_path):
+    store = StatsStore(str(tmp_path))
+    store.append(record(1))
+    data = record(2).pack()
+    with open(store.log_path, "ab") as f:
+        f.write(data[:10])
+    assert store.catch_up() == 0
+    with open(store.log_path, "ab") as f:
+        f.write(data[10:])
+    assert store.catch_up() == 1
+    assert store.stats.games == 2
+
+
+def test_truncated_log_rebuilds_aggregates(tmp_path):
+    store = StatsStore(str(tmp_path))
+    for i in range(4):
+        store.append(record(i))
+    with open(store.log_path, "r+b") as f:
+        f.truncate(len(LOG_HEADER) + RECORD.size)
+    store.catch_up()
+    assert store.stats.games == 1
+    assert StatsStore(str(tmp_path)).stats.games == 1
+
+
+def test_invalid_records_and_foreign_logs_do_not_break_the_store(tmp_path):
+    with open(tmp_path / "games.log", "wb") as f:
+        f.write(b"junk" * 50)  # an old-format or foreign file
+    store = StatsStore(str(tmp_path))
+    assert store.stats.games == 0
+    assert os.path.exists(tmp_path / "games.log.old")
+
+    store.append(record(1))
+    with open(store.log_path, "ab") as f:
+        f.write(b"\xff" * RECORD.size)
+    store.append(record(2))
+    assert store.stats.games == 2
+    assert store.skipped == 1
+    assert [r.finished_at for r in store.records()] == [record(1).finished_at,
+                                                         record(2).finished_at]
+
+
+def test_recorder_survives_an_unwritable_log(tmp_path):
+    game = Game(6, 6, seed=1)
+    recorder = GameRecorder(game, StatsStore(str(tmp_path / "missing")))
+    recorder.begin("p")
+    while game.is_running():
+        game.step()
+    assert isinstance(recorder.error, OSError)
+
+
+def test_recorder_logs_finished_games(tmp_path):
+    store = StatsStore(str(tmp_path))
+    game = Game(6, 6, seed=1)
+    recorder = GameRecorder(game, store)
+    recorder.begin("pé")
+    while game.is_running():
+        game.step()
+    (rec,) = store.records()
+    assert rec.username == "pé"
+    assert rec.cause == "wall"
+    assert rec.score == game.score
@@ -0,0 +1,65 @@
+# test_arena.py
+import random
+
+from snake_logic import Arena, Snake
+
+
+def check_invariants(arena: Arena):
+    size = arena.grid_width * arena.grid_height
+    expected = [0] * size
+    for sid, snake in enumerate(arena.snakes):
+        if not arena.alive[sid]:
+            continue
+        for p in snake.body:
+            idx = arena._index(p)
+            assert expected[idx] == 0, f"cell {p} held by two snakes"
+            expected[idx] = sid + 1
+    assert arena._occ == expected
+
+    taken = {i for i, v in enumerate(expected) if v} | arena.food
+    assert not ({i for i, v in enumerate(expected) if v} & arena.food)
+    assert sorted(arena._free) == sorted(set(range(size)) - taken)
+    for pos, idx in enumerate(arena._free):
+        assert arena._free_pos[idx] == pos
+    for idx in taken:
+        assert arena._free_pos[idx] == -1
+
+
+def test_random_arena_keeps_occupancy_and_free_index_consistent():
+    for seed in range(20):
+        rng = random.Random(seed)
+        arena = Arena(24, 18, food_count=6, rng=rng)
+        for _ in range(12):
+            arena.spawn_snake(start_length=rng.randint(1, 6))
+        arena.place_food()
+        check_invariants(arena)
+        for _ in range(300):
+            for sid in range(len(arena.snakes)):
+                if rng.random() < 0.3:
+                    arena.set_direction(sid, rng.choice(Snake.DIRECTION_NAMES))
+            result = arena.step()
+            check_invariants(arena)
+            assert result["alive"] == sum(arena.alive)
+            if not result["alive"]:
+                break
+
+
+def test_head_on_collision_kills_both():
+    arena = Arena(10, 3)
+    a = arena.add_snake((3, 1), start_length=2, start_dir="Right")
+    b = arena.add_snake((5, 1), start_length=2, start_dir="Left")
+    result = arena.step()
+    assert sorted(result["died"]) == [a, b]
+    check_invariants(arena)
+
+
+def test_moving_into_a_vacating_tail_is_allowed():
+    arena = Arena(10, 10)
+    # b's head follows a's tail, which moves away on the same tick.
+    a = arena.add_snake((5, 5), start_length=4, start_dir="Right")
+    b = arena.add_snake((2, 4), start_length=1, start_dir="Down")
+    result = arena.step()
+    assert result["died"] == []
+    assert arena.snakes[b].body[0] == (2, 5)
+    assert arena.alive[a]
+    check_invariants(arena)
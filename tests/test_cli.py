@@ -0,0 +1,26 @@
+# test_cli.py
+import pytest
+
+import snake
+
+
+@pytest.mark.parametrize("argv", [
+    ["simulate", "--games", "0"],
+    ["simulate", "--max-ticks", "-5"],
+    ["bench", "--ticks", "0"],
+    ["replay", "moves.jsonl", "--delay", "0"],
+    ["spectate", "--boards", "0"],
+    ["spectate", "--fps", "0"],
+])
+def test_counts_and_rates_must_be_positive(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        snake.build_parser().parse_args(argv)
+    assert exc.value.code == 2
+    assert "must be a positive" in capsys.readouterr().err
+
+
+def test_simulate_and_bench_run(capsys):
+    assert snake.main(["simulate", "--games", "1", "--width", "8", "--height", "6"]) == 0
+    assert snake.main(["bench", "--ticks", "1", "--width", "8", "--height", "6"]) == 0
+    out = capsys.readouterr().out
+    assert "1 steps in" in out
@@ -0,0 +1,117 @@
+# test_events.py
+import pytest
+
+from snake_logic import (
+    Game, EVENT_MOVED, EVENT_ATE, EVENT_SCORE_CHANGED, EVENT_DIED, EVENT_WON,
+)
+
+EVENTS = (EVENT_MOVED, EVENT_ATE, EVENT_SCORE_CHANGED, EVENT_DIED, EVENT_WON)
+
+
+def record_events(game: Game) -> list:
+    """Subscribe to everything; each entry also captures the game's state."""
+    log = []
+    for name in EVENTS:
+        game.subscribe(name, lambda ev, name=name: log.append(
+            (name, ev, game.score, game.food, game.running)))
+    return log
+
+
+def test_eating_emits_after_state_is_final():
+    game = Game(10, 5, seed=1)
+    hx, hy = game.snake.body[0]
+    game.food = (hx + 1, hy)
+    log = record_events(game)
+    result = game.step()
+
+    assert result == {"alive": True, "ate": True, "game_over": False, "score": 10}
+    assert [e[0] for e in log] == [EVENT_MOVED, EVENT_ATE, EVENT_SCORE_CHANGED]
+    moved, ate, score = log
+    assert moved[1].head == (hx + 1, hy) and moved[1].tail is None
+    assert moved[2] == 10  # score already updated when "moved" fires
+    assert moved[3] == game.food != (hx + 1, hy)  # food already respawned
+    assert ate[1].position == (hx + 1, hy) and ate[1].next_food == game.food
+    assert score[1] == (0, 10)
+
+
+def test_plain_move_reports_vacated_tail():
+    game = Game(10, 5, seed=1)
+    game.food = (0, 0)
+    tail = game.snake.body[-1]
+    log = record_events(game)
+    game.step()
+    assert [e[0] for e in log] == [EVENT_MOVED]
+    assert log[0][1].tail == tail
+
+
+def test_dying_emits_only_died():
+    game = Game(6, 3, seed=2)
+    game.food = (0, 0)
+    log = record_events(game)
+    while game.is_running():
+        result = game.step()
+    assert result["alive"] is False and result["game_over"] is True
+    assert log[-1][0] == EVENT_DIED
+    assert log[-1][1].cause == "wall" and log[-1][1].direction == "Right"
+    assert log[-1][4] is False  # not running any more when "died" fires
+    assert [e[0] for e in log[:-1]] == [EVENT_MOVED] * (len(log) - 1)
+
+
+def test_self_collision_cause():
+    game = Game(10, 10, start_length=5, seed=3)
+    game.food = (0, 0)
+    log = record_events(game)
+    for move in ("Up", "Left", "Down"):
+        game.step(move)
+    assert log[-1][0] == EVENT_DIED and log[-1][1].cause == "self"
+
+
+def test_filling_the_board_wins():
+    game = Game(3, 1, start_length=2, seed=1)
+    assert game.food == (2, 0)
+    log = record_events(game)
+    result = game.step()
+    assert result == {"alive": True, "ate": True, "game_over": True, "score": 10}
+    assert [e[0] for e in log] == [EVENT_MOVED, EVENT_ATE, EVENT_SCORE_CHANGED, EVENT_WON]
+    assert log[-1][1].score == 10
+    assert all(e[4] is False for e in log)  # already over for every subscriber
+    assert not game.is_running()
+    assert game.step()["game_over"]
+    assert len(log) == 4
+
+
+def test_reset_announces_score_only_when_it_changes():
+    game = Game(10, 5, seed=1)
+    log = record_events(game)
+    game.reset()
+    assert log == []
+    hx, hy = game.snake.body[0]
+    game.food = (hx + 1, hy)
+    game.step()
+    del log[:]
+    game.reset()
+    assert [(e[0], e[1]) for e in log] == [(EVENT_SCORE_CHANGED, (10, 0))]
+
+
+def test_unsubscribe_and_raising_subscriber():
+    game = Game(10, 5, seed=1)
+    calls = []
+    cb = game.subscribe(EVENT_MOVED, calls.append)
+    game.step()
+    game.unsubscribe(EVENT_MOVED, cb)
+    game.step()
+    assert len(calls) == 1
+    assert EVENT_MOVED not in game._listeners
+
+    def boom(ev):
+        raise RuntimeError("subscriber bug")
+
+    hx, hy = game.snake.body[0]
+    game.food = (hx + 1, hy)
+    game.subscribe(EVENT_MOVED, boom)
+    with pytest.raises(RuntimeError):
+        game.step()
+    # The tick itself completed before the subscriber ran.
+    assert game.score == 10
+    assert game.snake.body[0] == (hx + 1, hy)
+    assert game.food not in game.snake.body
@@ -0,0 +1,91 @@
+# test_input.py
+from snake_logic import Game, InputBuffer
+
+
+def quiet_game(**kwargs) -> Game:
+    """A game whose food is out of the way, heading Right from the centre."""
+    game = Game(12, 10, seed=1, **kwargs)
+    game.food = (0, 0)
+    return game
+
+
+def test_two_turns_in_one_tick_apply_over_two_ticks():
+    game = quiet_game()
+    hx, hy = game.snake.body[0]
+    assert game.queue_input("Up")
+    assert game.queue_input("Left")
+    game.step()
+    assert game.snake.direction == "Up"
+    assert game.snake.body[0] == (hx, hy - 1)
+    game.step()
+    assert game.snake.direction == "Left"
+    assert game.snake.body[0] == (hx - 1, hy - 1)
+    game.step()
+    assert game.snake.direction == "Left"  # buffer drained: keep going
+
+
+def test_inputs_are_judged_against_the_last_queued_direction():
+    game = quiet_game()
+    assert not game.queue_input("Right")  # repeats the current heading
+    assert not game.queue_input("Left")   # reverses it
+    assert game.queue_input("Up")
+    assert not game.queue_input("Up")     # repeats the queued turn
+    assert not game.queue_input("Down")   # reverses the queued turn
+    assert game.queue_input("Left")       # fine after Up, though opposite to Right
+    assert len(game.inputs) == 2
+    assert not game.queue_input("Sideways")
+
+
+def test_buffer_drops_inputs_beyond_capacity():
+    buf = InputBuffer(capacity=3)
+    assert buf.push("Up", "Right")
+    assert buf.push("Left", "Right")
+    assert buf.push("Down", "Right")
+    assert not buf.push("Right", "Right")
+    assert len(buf) == 3 and buf.last() == "Down"
+    assert [buf.pop()[0] for _ in range(3)] == ["Up", "Left", "Down"]
+    assert buf.pop() == (None, None)
+    # The ring wraps around once the oldest slots are free again.
+    for d in ("Up", "Right", "Down", "Left"):
+        buf.push(d, "Left")
+    assert [buf.pop()[0] for _ in range(len(buf))] == ["Up", "Right", "Down"]
+
+
+def test_reversal_allowed_at_length_one():
+    game = quiet_game(start_length=1)
+    hx, hy = game.snake.body[0]
+    assert game.queue_input("Left")
+    game.step()
+    assert game.is_running()
+    assert game.snake.body[0] == (hx - 1, hy)
+
+
+def test_reset_and_restore_discard_pending_inputs():
+    game = quiet_game()
+    blob = game.snapshot()
+    game.queue_input("Up")
+    game.reset()
+    assert len(game.inputs) == 0
+
+    game.queue_input("Up")
+    game.queue_input("Left")
+    game.restore_from(blob)
+    assert len(game.inputs) == 0
+    game.step()
+    assert game.snake.direction == "Right"
+
+
+def test_applied_input_time_carries_the_timestamp():
+    game = quiet_game()
+    game.queue_input("Up", timestamp=12.5)
+    game.queue_input("Left", timestamp=13.0)
+    game.step()
+    assert game.applied_input_time == 12.5
+    game.step()
+    assert game.applied_input_time == 13.0
+    game.step()
+    assert game.applied_input_time is None
+    game.queue_input("Down", timestamp=14.0)
+    game.step("Down")  # an explicit direction bypasses the buffer
+    assert game.applied_input_time is None
+    assert len(game.inputs) == 1
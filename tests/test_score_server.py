@@ -0,0 +1,87 @@
+# test_score_server.py
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import user_manager
+from score_server import ScoreServer, ScoreStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import sys
+import user_manager
+worker = int(sys.argv[1])
+for score in range(1, 26):
+    user_manager.update_high_score("shared", worker * 100 + score)
+    user_manager.update_high_score(f"u{worker}", score)
+"""
+
+
+def test_concurrent_writes_share_commits(tmp_path):
+    path = str(tmp_path / "users.json")
+
+    async def run():
+        store = ScoreStore(path)
+        await asyncio.gather(*(store.create_user(f"u{i}") for i in range(50)))
+        await asyncio.gather(*(store.update_high_score(f"u{i}", i + 1) for i in range(50)))
+        return store
+
+    store = asyncio.run(run())
+    assert store.writes == 100
+    assert store.commits < store.writes
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {f"u{i}": i + 1 for i in range(50)}
+
+
+@pytest.fixture
+def score_server(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps({"shared": 0, **{f"u{i}": 0 for i in range(8)}}))
+    address = f"unix:{tmp_path / 'scores.sock'}"
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "score_server.py"),
+                             address, "--file", str(path)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 10
+    while not (tmp_path / "scores.sock").exists():
+        assert proc.poll() is None and time.monotonic() < deadline, "server did not start"
+        time.sleep(0.02)
+    yield address, path
+    proc.terminate()
+    proc.wait()
+
+
+def test_no_lost_updates_across_processes(score_server, monkeypatch):
+    address, path = score_server
+    env = dict(os.environ, SNAKE_SCORE_SERVER=address, PYTHONPATH=ROOT)
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, str(i)], env=env)
+               for i in range(8)]
+    assert all(w.wait(timeout=60) == 0 for w in workers)
+
+    monkeypatch.setenv(user_manager.SCORE_SERVER_ENV, address)
+    expected = {"shared": 725, **{f"u{i}": 25 for i in range(8)}}
+    assert user_manager.load_users() == expected
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == expected
+
+
+def test_server_errors_propagate_instead_of_falling_back(score_server, monkeypatch):
+    address, path = score_server
+    monkeypatch.setenv(user_manager.SCORE_SERVER_ENV, address)
+    monkeypatch.setattr(user_manager, "USERS_FILE", "/nonexistent/users.json")
+    with pytest.raises(user_manager.ScoreServerError):
+        user_manager._remote("no_such_op")
+    assert user_manager.create_user("new") is True
+    assert user_manager.create_user("new") is False
+
+
+def test_second_server_refuses_a_live_socket(score_server, tmp_path):
+    address, _ = score_server
+    server = ScoreServer(ScoreStore(str(tmp_path / "other.json")))
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.serve(address))
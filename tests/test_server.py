@@ -0,0 +1,50 @@
+# test_server.py
+import asyncio
+import random
+
+import pytest
+
+from snake_logic import Snake
+from snake_server import MAX_CELLS, MSG_FULL, GameClient, GameServer
+
+
+def test_client_mirror_matches_server_state():
+    async def run():
+        server = GameServer(16, 12)
+        listener = await asyncio.start_server(server._handle_client, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        client = GameClient()
+        await client.connect("127.0.0.1", port, match_id=3)
+        assert await client.read_frame() == MSG_FULL
+        match = server.matches[3]
+
+        rng = random.Random(0)
+        resets = 0
+        for _ in range(2000):
+            if rng.random() < 0.2:
+                client.send_direction(rng.choice(Snake.DIRECTION_NAMES))
+                await client.writer.drain()
+                for _ in range(5):
+                    await asyncio.sleep(0)  # let the server read it
+            server.tick()
+            resets += await client.read_frame() == MSG_FULL
+            game = match.game
+            assert list(client.body) == list(game.snake.body)
+            assert client.food == game.food
+            assert client.score == game.score
+            assert client.direction == game.snake.direction
+            assert client.tick == match.tick
+            assert client.game_over == (not game.running)
+        assert resets > 0  # games ended and restarted along the way
+
+        client.close()
+        listener.close()
+        await listener.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_grid_too_large_for_wire_format_is_rejected():
+    with pytest.raises(ValueError):
+        GameServer(200, 100)
+    GameServer(MAX_CELLS // 100, 100)
@@ -0,0 +1,68 @@
+# test_snapshot.py
+import random
+
+from snake_logic import Game, RewindBuffer, Snake
+
+
+def state(game: Game):
+    return (list(game.snake.body), game.snake.direction, game.snake.next_direction,
+            game.food, game.score, game.running, game.rng_state)
+
+
+def play(game: Game, rng: random.Random, ticks: int):
+    moves = [rng.choice(Snake.DIRECTION_NAMES + (None,)) for _ in range(ticks)]
+    states = []
+    for move in moves:
+        game.step(move)
+        states.append(state(game))
+    return moves, states
+
+
+def test_restore_replays_identically():
+    for seed in range(30):
+        rng = random.Random(seed)
+        game = Game(12, 9, seed=seed)
+        play(game, rng, rng.randint(0, 40))
+        blob = game.snapshot()
+        saved = state(game)
+        moves, states = play(game, rng, 60)
+
+        # Into the same game and into a fresh one: both continue identically.
+        for target in (game, Game(12, 9)):
+            target.restore(blob)
+            assert state(target) == saved
+            replayed = []
+            for move in moves:
+                target.step(move)
+                replayed.append(state(target))
+            assert replayed == states
+
+
+def test_snapshot_into_offset_and_size_bound():
+    game = Game(30, 20, seed=1)
+    play(game, random.Random(1), 100)
+    buf = bytearray(7 + game.snapshot_size())
+    n = game.snapshot_into(buf, 7)
+    assert n <= game.snapshot_size()
+    other = Game(30, 20)
+    other.restore_from(buf, 7)
+    assert state(other) == state(game)
+
+
+def test_rewind_buffer():
+    game = Game(10, 10, seed=3)
+    rewind = RewindBuffer(game, capacity=8)
+    history = []
+    for _ in range(20):
+        rewind.record()
+        history.append(state(game))
+        game.step()
+        if not game.running:
+            break
+    assert len(rewind) == min(8, len(history))
+    assert rewind.rewind(3) == 3
+    assert state(game) == history[-4]
+    # Asking for more than is left stops at the oldest record kept.
+    left = len(rewind)
+    assert rewind.rewind(100) == left - 1
+    assert state(game) == history[-(left + 3)]
@@ -1,13 +1,121 @@
 # user_manager.py
 import json
 import os
-from typing import Dict, Optional
+import socket
+import sys
+from typing import Dict, List, Optional, Tuple
 
 USERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.json")
 
+# When set (``unix:/path`` or ``host:port``), every call below goes through
+# the score server (see score_server.py) instead of touching USERS_FILE.
+SCORE_SERVER_ENV = "SNAKE_SCORE_SERVER"
+
+_conn: Optional[Tuple[socket.socket, object]] = None
+_warned = False
+
+
+class ScoreServerError(Exception):
+    """The score server was reached but the request failed or went unanswered."""
+
+
+def _score_server() -> Optional[str]:
+    return os.environ.get(SCORE_SERVER_ENV) or None
+
+
+def _connect(address: str) -> Tuple[socket.socket, object]:
+    if address.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(5.0)
+        sock.connect(address[len("unix:"):])
+    else:
+        host, _, port = address.rpartition(":")
+        sock = socket.create_connection((host or "127.0.0.1", int(port)), timeout=5.0)
+    return sock, sock.makefile("rb")
+
+
+def _close():
+    global _conn
+    if _conn is not None:
+        _conn[0].close()
+        _conn = None
+
+
+def _peer_closed(sock: socket.socket) -> bool:
+    """True if the server hung up on this idle connection (e.g. it restarted)."""
+    sock.setblocking(False)
+    try:
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+    finally:
+        sock.settimeout(5.0)
+
+
+def _remote(op: str, **args):
+    """
+    Send one request to the score server. Raises OSError only if the server
+    cannot be reached at all, and ScoreServerError for anything that goes
+    wrong once a request may have been delivered.
+    """
+    global _conn
+    request = json.dumps(dict(args, op=op)).encode("utf-8") + b"\n"
+    for attempt in range(2):
+        if _conn is not None and _peer_closed(_conn[0]):
+            _close()
+        if _conn is None:
+            _conn = _connect(_score_server())
+        sock, reader = _conn
+        try:
+            sock.sendall(request)
+            break
+        except OSError as e:
+            # The server ignores a request line cut short, so nothing was
+            # applied and sending again on a new connection is safe.
+            _close()
+            if attempt:
+                raise ScoreServerError(f"cannot send to score server: {e}") from e
+    # From here on the request may have been applied: never resend it.
+    try:
+        line = reader.readline()
+    except OSError as e:
+        _close()
+        raise ScoreServerError(f"no reply from score server: {e}") from e
+    if not line:
+        _close()
+        raise ScoreServerError("score server closed the connection")
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise ScoreServerError(reply.get("error", "score server error"))
+    return reply["result"]
+
+
+def _via_server(op: str, **args):
+    """
+    Returns (True, result) when the call was served remotely, or (False, None)
+    when no server is configured or it cannot be reached. Errors reported by
+    a reachable server propagate: writing the file behind its back would be
+    undone by its next commit.
+    """
+    global _warned
+    if not _score_server():
+        return False, None
+    try:
+        return True, _remote(op, **args)
+    except OSError as e:
+        if not _warned:
+            print(f"score server unavailable ({e}); using {USERS_FILE}", file=sys.stderr)
+            _warned = True
+        return False, None
+
 
 def load_users() -> Dict[str, int]:
     """Load users from users.json. Returns dict of {username: high_score}."""
+    served, result = _via_server("load_users")
+    if served:
+        return result
     if not os.path.exists(USERS_FILE):
         return {}
     try:
@@ -22,12 +130,21 @@ def load_users() -> Dict[str, int]:
 
 def save_users(users: Dict[str, int]):
     """Save users dict to users.json."""
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
+    served, _ = _via_server("save_users", users=users)
+    if served:
+        return
+    # Write a temp file and swap it in so readers never see a partial file.
+    tmp = f"{USERS_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(users, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, USERS_FILE)
 
 
 def create_user(username: str) -> bool:
     """Create a new user. Returns False if username already exists."""
+    served, result = _via_server("create_user", username=username)
+    if served:
+        return result
     users = load_users()
     if username in users:
         return False
@@ -38,6 +155,9 @@ def create_user(username: str) -> bool:
 
 def update_high_score(username: str, score: int) -> bool:
     """Update user's high score if the new score is higher. Returns True if updated."""
+    served, result = _via_server("update_high_score", username=username, score=score)
+    if served:
+        return result
     users = load_users()
     if username not in users:
         return False
@@ -50,10 +170,24 @@ def update_high_score(username: str, score: int) -> bool:
 
 def get_high_score(username: str) -> int:
     """Get the high score for a user."""
+    served, result = _via_server("get_high_score", username=username)
+    if served:
+        return result
     users = load_users()
     return users.get(username, 0)
 
 
+def get_top_scores(k: int = 10) -> List[Tuple[str, int]]:
+    """The `k` best (username, high_score) pairs, best first."""
+    served, result = _via_server("top", k=k)
+    if served:
+        return [tuple(item) for item in result]
+    return sorted(load_users().items(), key=lambda x: x[1], reverse=True)[:k]
+
+
 def has_users() -> bool:
     """Check if there are any existing users."""
+    served, result = _via_server("has_users")
+    if served:
+        return result
     return len(load_users()) > 0